@@ -0,0 +1,54 @@
+"""Add manga metadata table
+
+Revision ID: 4b7d2e9a1c3f
+Revises: fece11444075
+Create Date: 2026-10-18 10:02:11.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7d2e9a1c3f'
+down_revision: Union[str, Sequence[str], None] = 'fece11444075'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "mangametadata",
+        sa.Column("mal_id", sa.Integer(), nullable=False),
+        sa.Column("title", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("status", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("cover_url", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("author", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("year", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("rating", sa.Float(), nullable=True),
+        sa.Column("tags", sa.JSON(), server_default="[]", nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column(
+            "alternative_title", sqlmodel.sql.sqltypes.AutoString(), nullable=True
+        ),
+        sa.Column(
+            "fetched_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("mal_id"),
+    )
+    op.create_index(
+        op.f("ix_mangametadata_fetched_at"), "mangametadata", ["fetched_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_mangametadata_fetched_at"), table_name="mangametadata")
+    op.drop_table("mangametadata")
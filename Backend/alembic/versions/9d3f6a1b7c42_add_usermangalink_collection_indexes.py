@@ -0,0 +1,40 @@
+"""Add usermangalink collection indexes
+
+Revision ID: 9d3f6a1b7c42
+Revises: c81f0a6d5e27
+Create Date: 2026-10-18 15:02:11.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f6a1b7c42'
+down_revision: Union[str, Sequence[str], None] = 'c81f0a6d5e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pagination of a collection, optionally filtered by status, in
+    # either direction of (added_at, manga_id).
+    op.create_index(
+        "ix_usermangalink_user_added",
+        "usermangalink",
+        ["user_id", "added_at", "manga_id"],
+    )
+    op.create_index(
+        "ix_usermangalink_user_status_added",
+        "usermangalink",
+        ["user_id", "status", "added_at", "manga_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_usermangalink_user_status_added", table_name="usermangalink")
+    op.drop_index("ix_usermangalink_user_added", table_name="usermangalink")
@@ -0,0 +1,57 @@
+"""Add manga metadata search index
+
+Revision ID: c81f0a6d5e27
+Revises: 4b7d2e9a1c3f
+Create Date: 2026-10-18 11:24:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f0a6d5e27'
+down_revision: Union[str, Sequence[str], None] = '4b7d2e9a1c3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "mangametadata",
+        sa.Column("search_text", sa.Text(), server_default="", nullable=False),
+    )
+    # Backfill rows mirrored before this column existed; the app normalizes
+    # with NFKC + casefold, lower() is close enough until the row is next refreshed.
+    op.execute(
+        """
+        UPDATE mangametadata SET search_text = lower(concat_ws(' ',
+            title, alternative_title, author,
+            (SELECT string_agg(tag, ' ') FROM json_array_elements_text(tags) AS tag)
+        ))
+        """
+    )
+    op.create_index(
+        "ix_mangametadata_search_text_trgm",
+        "mangametadata",
+        ["search_text"],
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_mangametadata_search_text_fts",
+        "mangametadata",
+        [sa.text("to_tsvector('simple', search_text)")],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_mangametadata_search_text_fts", table_name="mangametadata")
+    op.drop_index("ix_mangametadata_search_text_trgm", table_name="mangametadata")
+    op.drop_column("mangametadata", "search_text")
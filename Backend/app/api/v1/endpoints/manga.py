@@ -1,70 +1,166 @@
+import time
+from email.utils import formatdate, parsedate_to_datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, Response, status, HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import settings
 # Correct the import path for the dependency
 from app.utils.deps import get_current_user
 from app.db.session import get_session
 from app.models.user_model import User
+from app.models.manga_model import MangaStatus
 from app.schemas.manga_schema import (
+    CollectionBulkRequest,
+    CollectionBulkResult,
+    CollectionSort,
     MangaCreate,
+    MangaDetailsBatch,
+    MangaDetailsBatchQuery,
+    MangaDetailsBatchRequest,
     MangaRead,
     MangaUpdate,
     UserCollectionManga,
 )
 from app.services import manga_service
+from app.services.cache import CacheEntry
 
 router = APIRouter()
 
+
+def _not_modified(request: Request, entry: CacheEntry) -> bool:
+    if if_none_match := request.headers.get("if-none-match"):
+        # If-None-Match uses weak comparison, so a W/ prefix still matches.
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or entry.etag in tags
+    if entry.refreshed_at and (if_modified_since := request.headers.get("if-modified-since")):
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(entry.refreshed_at) <= since
+    return False
+
+
+def _cached_json(request: Request, entry: CacheEntry) -> Response:
+    """
+    Sends a cache entry's stored JSON bytes as the response body, with a strong
+    ETag and Last-Modified taken from the entry, and answers conditional
+    requests with 304. The data was validated against MangaRead when it was
+    cached, so FastAPI's response_model validation and re-encoding are skipped
+    on purpose.
+    """
+    # Let clients keep a copy until we would refresh it ourselves, within a cap.
+    fresh_for = int(entry.soft_expires_at - time.time())
+    max_age = max(0, min(settings.HTTP_CACHE_MAX_AGE, fresh_for))
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": (
+            f"public, max-age={max_age}, "
+            f"stale-while-revalidate={settings.HTTP_CACHE_STALE_WHILE_REVALIDATE}"
+        ),
+    }
+    if entry.refreshed_at:
+        headers["Last-Modified"] = formatdate(entry.refreshed_at, usegmt=True)
+
+    if _not_modified(request, entry):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.raw, media_type="application/json", headers=headers)
+
+
 # === Jikan Data Endpoints (Cached) ===
 
 
+@router.get("/manga/details", response_model=MangaDetailsBatch)
+async def get_many_manga_details(
+    ids: str = Query(
+        ...,
+        description=(
+            f"Comma-separated mal_ids, e.g. 1,2,3; at most "
+            f"{settings.MANGA_DETAILS_BATCH_MAX_IDS}"
+        ),
+    ),
+):
+    try:
+        batch_in = MangaDetailsBatchQuery(ids=ids)
+    except ValidationError as e:
+        # Reported like any other invalid query parameter.
+        raise RequestValidationError(
+            [{**error, "loc": ("query", *error["loc"])} for error in e.errors()]
+        )
+    return await manga_service.get_manga_details_batch_service(batch_in.ids)
+
+
+@router.post("/manga/details", response_model=MangaDetailsBatch)
+async def post_many_manga_details(batch_in: MangaDetailsBatchRequest):
+    """
+    Same as GET /manga/details, for lists too long for a query string
+    (up to MANGA_DETAILS_BATCH_POST_MAX_IDS ids).
+    """
+    return await manga_service.get_manga_details_batch_service(batch_in.ids)
+
+
 @router.get("/manga/details/{mal_id}", response_model=MangaRead)
-async def get_manga_details(mal_id: int):
-    details = await manga_service.get_manga_details_service(mal_id)
-    if not details:
+async def get_manga_details(mal_id: int, request: Request):
+    entry = await manga_service.get_manga_details_entry(mal_id)
+    if not entry:
         raise HTTPException(status_code=404, detail="Manga not found")
-    return details
+    return _cached_json(request, entry)
 
 
 @router.get("/manga/top/manga", response_model=List[MangaRead])
-async def get_top_manga(filter: Optional[str] = None):
-    manga_list_dicts = await manga_service.get_top_manga_service(filter=filter)
-    return [MangaRead(**manga) for manga in manga_list_dicts]
+async def get_top_manga(request: Request, filter: Optional[str] = None):
+    return _cached_json(
+        request, await manga_service.get_top_manga_service(filter=filter)
+    )
 
 
 @router.get("/manga/search", response_model=List[MangaRead])
-async def search_manga(q: str = Query(..., min_length=3)):
-    manga_list_dicts = await manga_service.search_manga_service(q)
+async def search_manga(
+    q: str = Query(..., min_length=3),
+    limit: int = Query(10, ge=1, le=25),
+    offset: int = Query(0, ge=0),
+):
+    manga_list_dicts = await manga_service.search_manga_service(
+        q, limit=limit, offset=offset
+    )
     return [MangaRead(**manga) for manga in manga_list_dicts]
 
 
 @router.get("/manga/recommended", response_model=List[MangaRead])
-async def get_recommendations():
-    manga_list_dicts = await manga_service.get_recommendations_service()
-    return [MangaRead(**manga) for manga in manga_list_dicts]
+async def get_recommendations(request: Request):
+    return _cached_json(request, await manga_service.get_recommendations_service())
 
 
 @router.get("/manga/genre/{genre_id}", response_model=List[MangaRead])
-async def get_manga_by_genre(genre_id: int):
-    manga_list_dicts = await manga_service.get_manga_by_genre_service(genre_id=genre_id)
-    return [MangaRead(**manga) for manga in manga_list_dicts]
+async def get_manga_by_genre(genre_id: int, request: Request):
+    return _cached_json(
+        request,
+        await manga_service.get_manga_by_genre_service(genre_id=genre_id),
+    )
 
 
 @router.get("/manga/news")
-async def get_combined_news():
-    return await manga_service.get_combined_news_service()
+async def get_combined_news(request: Request):
+    return _cached_json(request, await manga_service.get_combined_news_service())
 
 
 @router.get("/manga/", response_model=dict)
 async def get_paginated_manga(
+    request: Request,
     page: int = 1,
     limit: int = 25,
     genre: str | None = None,
 ):
     filters = {"genres": genre} if genre else {}
-    return await manga_service.get_paginated_manga_service(page, limit, filters)
+    return _cached_json(
+        request,
+        await manga_service.get_paginated_manga_service(page, limit, filters),
+    )
 
 
 # === User Collection Endpoints (Protected) ===
@@ -72,13 +168,44 @@ async def get_paginated_manga(
 
 @router.get("/manga/user/collection", response_model=List[UserCollectionManga])
 async def get_user_collection(
+    response: Response,
+    status_filter: Optional[MangaStatus] = Query(None, alias="status"),
+    sort: CollectionSort = CollectionSort.NEWEST,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_session),
 ):
-    """Get the current logged-in user's manga collection with full details."""
-    return await manga_service.get_user_collection_service(
-        current_user=current_user, db=db
+    """
+    Get the current logged-in user's manga collection with full details.
+    Pass `limit` to page through it; the cursor for the next page is sent in
+    the X-Next-Cursor header and is absent on the last page.
+    """
+    collection, next_cursor = await manga_service.get_user_collection_service(
+        current_user=current_user,
+        db=db,
+        status_filter=status_filter,
+        sort=sort,
+        cursor=cursor,
+        limit=limit,
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return collection
+
+
+@router.get("/manga/user/collection/stream")
+async def stream_user_collection(current_user: User = Depends(get_current_user)):
+    """
+    The current user's collection as NDJSON, one UserCollectionManga per line,
+    sent as soon as each title's details are known.
+    """
+
+    async def _ndjson():
+        async for item in manga_service.stream_user_collection_service(current_user.id):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
 
 
 @router.post("/manga/collection", status_code=status.HTTP_201_CREATED)
@@ -92,6 +219,21 @@ async def add_manga_to_collection(
     )
 
 
+@router.post("/manga/collection/bulk", response_model=CollectionBulkResult)
+async def bulk_update_collection(
+    bulk_in: CollectionBulkRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Adds, updates and removes many manga in one transaction. Each operation
+    gets its own outcome, so one conflict does not fail the others.
+    """
+    return await manga_service.bulk_update_collection_service(
+        operations=bulk_in.operations, current_user=current_user, db=db
+    )
+
+
 @router.put("/manga/collection/{mal_id}", response_model=MangaRead)
 async def update_manga_status(
     mal_id: int,
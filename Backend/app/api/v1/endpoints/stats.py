@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends
+
+from app.core import security
+from app.db import session
+from app.services import cache, jikan_client, user_cache
+from app.utils.deps import get_stats_admin
+
+# Internal state (limiter, breaker, pools, cache layout), so admins only.
+router = APIRouter(tags=["Stats"], dependencies=[Depends(get_stats_admin)])
+
+
+@router.get("/stats/jikan")
+async def get_jikan_stats():
+    """Connection pool usage and rate limiter wait times for Jikan calls."""
+    return {
+        "pool": jikan_client.get_pool_stats(),
+        "rate_limiter": jikan_client.jikan_rate_limiter.stats(),
+        "circuit_breaker": jikan_client.jikan_breaker.stats(),
+    }
+
+
+@router.get("/stats/db")
+async def get_db_stats():
+    """Connections in use and checkout wait times for the database pool."""
+    return session.get_pool_stats()
+
+
+@router.get("/stats/cache")
+async def get_cache_stats():
+    """Hit, miss and eviction counters for the in-process cache tier."""
+    return cache.get_stats()
+
+
+@router.get("/stats/users")
+async def get_user_cache_stats():
+    """Hit and miss counters for the authenticated user cache."""
+    return user_cache.get_stats()
+
+
+@router.get("/stats/passwords")
+async def get_password_hash_stats():
+    """Queue depth and timings of the password hashing pool."""
+    return security.get_password_hash_stats()
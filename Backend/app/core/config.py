@@ -10,11 +10,148 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     REDIS_URL : str
     
+    # Async database engine. Statement caches must be 0 behind PgBouncer in transaction mode.
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 60 * 30
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg's own prepared statement cache
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # SQLAlchemy's asyncpg adapter cache
+    DB_STATEMENT_TIMEOUT_MS: int = 15000  # 0 disables it
+
     # Other settings...
     PROJECT_NAME: str = "Manga Verse API"
     API_V1_STR: str = "/api/v1"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    # Accounts allowed to read the /stats endpoints; empty means nobody.
+    STATS_ADMIN_EMAILS: list[str] = []
+
+    # Password hashing runs on its own thread pool so bcrypt never blocks the event loop.
+    # Raising the rounds upgrades each user's hash the next time they log in.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # Jikan HTTP client (one pooled client shared by the whole worker)
+    # Point this at a local fixture server to run without the real Jikan.
+    JIKAN_API_BASE_URL: str = "https://api.jikan.moe/v4"
+    JIKAN_HTTP2: bool = False  # needs the optional `h2` package
+    JIKAN_MAX_CONNECTIONS: int = 20
+    JIKAN_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    JIKAN_KEEPALIVE_EXPIRY: float = 30.0
+    JIKAN_CONNECT_TIMEOUT: float = 5.0
+    JIKAN_POOL_TIMEOUT: float = 10.0
+    # Read timeouts per endpoint family, in seconds
+    JIKAN_DETAILS_TIMEOUT: float = 10.0
+    JIKAN_LIST_TIMEOUT: float = 15.0
+    JIKAN_SEARCH_TIMEOUT: float = 10.0
+    JIKAN_NEWS_TIMEOUT: float = 8.0
+    # Jikan's published quotas, shared by every worker through Redis
+    JIKAN_RATE_PER_SECOND: int = 3
+    JIKAN_RATE_PER_MINUTE: int = 60
+    # After Redis fails, use the local buckets this long before trying it again
+    JIKAN_RATE_LIMIT_REDIS_RETRY_SECONDS: float = 5.0
+    # Retries for 429/5xx/timeouts, with jittered exponential backoff
+    JIKAN_MAX_RETRIES: int = 3
+    JIKAN_BACKOFF_BASE: float = 0.5
+    JIKAN_BACKOFF_MAX: float = 8.0
+    JIKAN_RETRY_AFTER_MAX: float = 30.0  # cap on how long we honour Retry-After
+    # Circuit breaker: fail fast after this many failed requests in a row
+    JIKAN_BREAKER_FAILURE_THRESHOLD: int = 5
+    JIKAN_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Cache refresh coordination between workers
+    CACHE_LOCK_LEASE_SECONDS: float = 10.0
+    CACHE_LOCK_POLL_INTERVAL: float = 0.1
+    # Max concurrent upstream fetches when filling cache misses for a batch
+    CACHE_BATCH_FETCH_CONCURRENCY: int = 5
+    # Most mal_ids one batch details request may ask for: GET fits them in the
+    # query string, POST is for longer lists
+    MANGA_DETAILS_BATCH_MAX_IDS: int = 50
+    MANGA_DETAILS_BATCH_POST_MAX_IDS: int = 500
+
+    # Cache TTLs per key family, in seconds. Past the soft TTL a cached value is
+    # still served but refreshed in the background; past the hard TTL it is gone.
+    CACHE_DETAILS_SOFT_TTL: int = 60 * 60 * 24  # 24 hours
+    CACHE_DETAILS_HARD_TTL: int = 60 * 60 * 24 * 7  # 7 days
+    CACHE_TOP_SOFT_TTL: int = 60 * 60 * 2  # 2 hours
+    CACHE_TOP_HARD_TTL: int = 60 * 60 * 24
+    CACHE_SEARCH_SOFT_TTL: int = 60 * 60
+    CACHE_SEARCH_HARD_TTL: int = 60 * 60 * 24
+    CACHE_RECOMMENDATIONS_SOFT_TTL: int = 60 * 60 * 24
+    CACHE_RECOMMENDATIONS_HARD_TTL: int = 60 * 60 * 24 * 3
+    CACHE_GENRE_SOFT_TTL: int = 60 * 60 * 24
+    CACHE_GENRE_HARD_TTL: int = 60 * 60 * 24 * 3
+    CACHE_NEWS_SOFT_TTL: int = 60 * 60 * 6  # 6 hours
+    CACHE_NEWS_HARD_TTL: int = 60 * 60 * 24
+    CACHE_LIST_SOFT_TTL: int = 60 * 60
+    CACHE_LIST_HARD_TTL: int = 60 * 60 * 12
+    # How long past the hard TTL an entry is kept, to be served only if Jikan fails
+    CACHE_STALE_IF_ERROR_SECONDS: int = 60 * 60 * 24
+    # How long a "not found" answer from Jikan (unknown mal_id, search with no results) is remembered
+    CACHE_NEGATIVE_TTL: int = 60 * 5
+    # How often each worker re-reads the per-family cache generations from Redis
+    CACHE_GENERATION_REFRESH_SECONDS: float = 5.0
+
+    # Cached payloads at least this large are compressed before going to Redis.
+    # "zstd" needs the zstandard package and falls back to zlib without it; "none" disables it.
+    CACHE_COMPRESSION: str = "zstd"
+    CACHE_COMPRESSION_LEVEL: int = 3
+    CACHE_COMPRESSION_MIN_BYTES: int = 512
+    # List families stored as mal_id references into manga_details instead of full objects
+    CACHE_REF_FAMILIES: list[str] = ["top_manga", "genre", "search"]
+
+    # Postgres mirror of Jikan metadata: rows younger than this are served
+    # without calling Jikan; older rows are still used when Jikan is down.
+    CATALOGUE_MAX_AGE_SECONDS: int = 60 * 60 * 24  # 24 hours
+    # Max background mirror refreshes one collection view may trigger
+    CATALOGUE_REFRESHES_PER_REQUEST: int = 10
+    # Rows fetched per round trip when streaming a collection, and enriched together
+    COLLECTION_STREAM_CHUNK_SIZE: int = 100
+    # Most operations one bulk collection request may carry
+    COLLECTION_BULK_MAX_OPERATIONS: int = 500
+    # Local search over the mirror; pg_trgm word similarity needed for a fuzzy match
+    SEARCH_SIMILARITY_THRESHOLD: float = 0.5
+    # Bulk catalogue sync (sync_catalogue.py)
+    CATALOGUE_SYNC_PAGE_SIZE: int = 25  # Jikan's maximum
+    CATALOGUE_SYNC_PAGES_PER_BATCH: int = 10
+
+    # Background cache warmer: refreshes hot keys before they go stale.
+    # One worker warms per cycle, spending at most the budget in Jikan calls.
+    CACHE_WARMER_ENABLED: bool = True
+    CACHE_WARMER_INTERVAL_SECONDS: int = 60 * 10
+    CACHE_WARMER_JIKAN_BUDGET: int = 60
+    CACHE_WARMER_TOP_FILTERS: list[str] = ["popular", "favorite"]
+    CACHE_WARMER_GENRE_IDS: list[int] = [62, 22, 1, 4, 10]
+    CACHE_WARMER_LIST_PAGES: int = 3
+    CACHE_WARMER_LIST_PAGE_SIZE: int = 25
+    CACHE_WARMER_TOP_COLLECTED: int = 100
+
+    # HTTP caching of catalogue responses (browsers and the CDN)
+    HTTP_CACHE_MAX_AGE: int = 300
+    HTTP_CACHE_STALE_WHILE_REVALIDATE: int = 60
+
+    # In-process L1 cache in front of Redis, kept in sync across workers via pub/sub
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_ENTRIES: int = 2048
+    CACHE_L1_TTL_SECONDS: float = 30.0
+    CACHE_L1_FAMILIES: list[str] = [
+        "manga_details",
+        "top_manga",
+        "manga_recommendations",
+        "combined_news",
+        "genre",
+        "manga_list",
+    ]
+
+    # Authenticated user lookups, keyed by token subject. Redis backing lets
+    # workers share them; either way a changed user is stale for at most the TTL.
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_ENTRIES: int = 4096
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_REDIS: bool = False
 
     model_config = SettingsConfigDict(
         env_file=env_path, 
@@ -1,20 +1,79 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Callable, TypeVar
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from app.core.config import settings
 
+T = TypeVar("T")
+
+# Hashes below the configured rounds are reported as needing an update, so
+# they get rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+# --- Off-loop hashing ---
+# bcrypt takes a few hundred milliseconds of CPU per call. The async wrappers
+# below run it on a small dedicated pool; its size caps how many hashes run
+# at once, and everything else waits in the pool's queue.
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_pending = 0
+_max_pending = 0
+_completed = 0
+_total_seconds = 0.0
+
+
+async def _run_hasher(func: Callable[..., T], *args) -> T:
+    global _pending, _max_pending, _completed, _total_seconds
+    _pending += 1
+    _max_pending = max(_max_pending, _pending)
+    started = time.monotonic()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _pending -= 1
+        _completed += 1
+        _total_seconds += time.monotonic() - started
+
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+async def hash_password(password: str) -> str:
+    return await _run_hasher(pwd_context.hash, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Checks a password. Returns (valid, new hash); the new hash is only set when
+    the password is valid and the stored hash uses outdated settings.
+    """
+    return await _run_hasher(pwd_context.verify_and_update, plain_password, hashed_password)
 
-    return pwd_context.verify(plain_password, hashed_password)
 
+def get_password_hash_stats() -> dict:
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "rounds": settings.BCRYPT_ROUNDS,
+        "pending": _pending,
+        "queue_depth": max(0, _pending - settings.PASSWORD_HASH_WORKERS),
+        "max_pending": _max_pending,
+        "completed": _completed,
+        "avg_seconds": round(_total_seconds / _completed, 3) if _completed else 0.0,
+    }
 
-def get_password_hash(password: str) -> str:
 
-    return pwd_context.hash(password)
+def shutdown_password_hasher() -> None:
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
 
 
 # --- JWT Token Handling ---
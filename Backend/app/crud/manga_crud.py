@@ -1,79 +1,378 @@
 # app/crud/manga_crud.py
+import datetime
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from app.models.manga_model import Manga, UserMangaLink, MangaStatus
-from sqlalchemy.orm import selectinload
+from app.models.manga_model import Manga, MangaMetadata, UserMangaLink, MangaStatus
+from sqlalchemy import delete, func, literal, literal_column, or_, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.utils.text import normalize_text
 
 # === Operations on the main Manga table ===
 
 
-async def get_or_create_manga(mal_id: int, db: AsyncSession) -> Manga:
+def _manga_ids_cte(mal_ids: list[int]):
     """
-    Get a manga by mal_id, or create it if it doesn't exist.
-    This prevents duplicate entries in our public 'manga' table.
+    A data-modifying CTE that creates any missing Manga rows and returns
+    (id, mal_id) for every given mal_id. DO UPDATE rather than DO NOTHING, so
+    rows that already exist, or that a concurrent request just created, are
+    returned too.
     """
-    statement = select(Manga).where(Manga.mal_id == mal_id)
+    statement = pg_insert(Manga).values([{"mal_id": mal_id} for mal_id in mal_ids])
+    return (
+        statement.on_conflict_do_update(
+            index_elements=[Manga.mal_id], set_={"mal_id": statement.excluded.mal_id}
+        )
+        .returning(Manga.id, Manga.mal_id)
+        .cte("manga_ids")
+    )
+
+
+# === Operations on the MangaMetadata mirror ===
+
+_METADATA_COLUMNS = [
+    "mal_id",
+    "title",
+    "status",
+    "cover_url",
+    "author",
+    "year",
+    "rating",
+    "tags",
+    "description",
+    "alternative_title",
+]
+
+
+def _search_text(row: dict) -> str:
+    parts = [row["title"], row["alternative_title"], row["author"], *row["tags"]]
+    return normalize_text(" ".join(part for part in parts if part))
+
+
+async def upsert_manga_metadata(
+    items: list[dict],
+    db: AsyncSession,
+    only_if_fetched_before: datetime.datetime | None = None,
+) -> int:
+    """
+    Insert or refresh mirror rows from MangaRead dumps in a single statement.
+    `fetched_at` is reset to now() for every row written. With
+    `only_if_fetched_before`, existing rows fetched after that time are left alone.
+    Returns the number of rows inserted or updated.
+    """
+    # ON CONFLICT cannot touch the same row twice in one statement, so dedupe first.
+    rows = {}
+    for item in items:
+        row = {column: item.get(column) for column in _METADATA_COLUMNS}
+        row["year"] = str(row["year"]) if row["year"] is not None else None
+        row["tags"] = row["tags"] or []
+        row["search_text"] = _search_text(row)
+        rows[row["mal_id"]] = row
+    if not rows:
+        return 0
+
+    statement = pg_insert(MangaMetadata).values(list(rows.values()))
+    statement = statement.on_conflict_do_update(
+        index_elements=[MangaMetadata.mal_id],
+        set_={
+            **{column: statement.excluded[column] for column in _METADATA_COLUMNS[1:]},
+            "search_text": statement.excluded.search_text,
+            "fetched_at": func.now(),
+        },
+        where=(
+            MangaMetadata.fetched_at < only_if_fetched_before
+            if only_if_fetched_before is not None
+            else None
+        ),
+    )
     result = await db.execute(statement)
-    db_manga = result.scalar_one_or_none()
+    await db.commit()
+    return result.rowcount
 
-    if not db_manga:
-        db_manga = Manga(mal_id=mal_id)
-        db.add(db_manga)
-        await db.commit()
-        await db.refresh(db_manga)
 
-    return db_manga
+async def get_manga_metadata(
+    mal_ids: list[int], db: AsyncSession
+) -> dict[int, MangaMetadata]:
+    """Fetch mirror rows for many mal_ids in one query."""
+    if not mal_ids:
+        return {}
+    statement = select(MangaMetadata).where(MangaMetadata.mal_id.in_(mal_ids))
+    result = await db.execute(statement)
+    return {row.mal_id: row for row in result.scalars().all()}
 
 
-# === Operations on the UserMangaLink table ===
-async def get_user_manga_link(
-    user_id: int, manga_id: int, db: AsyncSession
-) -> UserMangaLink | None:
-    """Check if a specific user has a specific manga in their collection."""
-    statement = select(UserMangaLink).where(
-        UserMangaLink.user_id == user_id, UserMangaLink.manga_id == manga_id
+async def expire_manga_metadata(mal_ids: list[int], db: AsyncSession) -> int:
+    """
+    Mark mirror rows as stale so the next read refetches them from Jikan.
+    The rows are kept to be served if that fetch fails. Returns the number of rows touched.
+    """
+    if not mal_ids:
+        return 0
+    statement = (
+        update(MangaMetadata)
+        .where(MangaMetadata.mal_id.in_(mal_ids))
+        .values(fetched_at=datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc))
     )
     result = await db.execute(statement)
-    return result.scalar_one_or_none()
+    await db.commit()
+    return result.rowcount
+
+
+async def search_manga_metadata(
+    query: str, limit: int, offset: int, similarity_threshold: float, db: AsyncSession
+) -> list[MangaMetadata]:
+    """
+    Ranked search over the mirror. `query` must already be normalized.
+    Matches on full-text words, or on trigram word similarity so typos and
+    spacing variants ("onepiece") still find the title. Uses the GIN indexes on
+    search_text.
+    """
+    # A literal config name, so the expression matches the one in the GIN index.
+    config = literal_column("'simple'")
+    document = func.to_tsvector(config, MangaMetadata.search_text)
+    ts_query = func.plainto_tsquery(config, query)
+    similarity = func.word_similarity(query, MangaMetadata.search_text)
+
+    # The `<%` operator reads its threshold from this setting; scope it to the transaction.
+    await db.execute(
+        select(
+            func.set_config(
+                "pg_trgm.word_similarity_threshold", str(similarity_threshold), True
+            )
+        )
+    )
+    statement = (
+        select(MangaMetadata)
+        .where(
+            or_(
+                document.op("@@")(ts_query),
+                literal(query).op("<%")(MangaMetadata.search_text),
+            )
+        )
+        .order_by(
+            (func.ts_rank(document, ts_query) + similarity).desc(),
+            MangaMetadata.rating.desc().nulls_last(),
+            MangaMetadata.mal_id,
+        )
+        .offset(offset)
+        .limit(limit)
+    )
+    result = await db.execute(statement)
+    return result.scalars().all()
+
+
+# === Operations on the UserMangaLink table ===
+# Each collection mutation is a single statement keyed by mal_id, so there is
+# no window between checking for a link and writing it.
+
+_LINK_COLUMNS = (
+    UserMangaLink.user_id,
+    UserMangaLink.manga_id,
+    UserMangaLink.status,
+    UserMangaLink.added_at,
+)
 
 
 async def add_manga_to_user_collection(
-    user_id: int, manga_id: int, db: AsyncSession
-) -> UserMangaLink:
-    """Add a manga to a user's collection by creating a link."""
-    db_link = UserMangaLink(user_id=user_id, manga_id=manga_id)
-    db.add(db_link)
+    user_id: int, mal_id: int, db: AsyncSession, status: MangaStatus = MangaStatus.PLANNED
+) -> UserMangaLink | None:
+    """
+    Add a manga to a user's collection, creating the Manga row if needed.
+    Returns the new link, or None if the manga was already in the collection.
+    """
+    manga_ids = _manga_ids_cte([mal_id])
+    statement = (
+        pg_insert(UserMangaLink)
+        .from_select(
+            ["user_id", "manga_id", "status"],
+            select(
+                literal(user_id),
+                manga_ids.c.id,
+                literal(status, UserMangaLink.__table__.c.status.type),
+            ),
+        )
+        .on_conflict_do_nothing(
+            index_elements=[UserMangaLink.user_id, UserMangaLink.manga_id]
+        )
+        .returning(*_LINK_COLUMNS)
+        # Postgres only allows a data-modifying WITH at the top level.
+        .add_cte(manga_ids)
+    )
+    result = await db.execute(statement)
+    row = result.one_or_none()
     await db.commit()
-    await db.refresh(db_link)
-    return db_link
+    return UserMangaLink(**row._mapping) if row else None
 
 
-async def remove_manga_from_user_collection(link: UserMangaLink, db: AsyncSession):
-    """Remove a manga from a user's collection by deleting the link."""
-    await db.delete(link)
+async def update_user_manga_status(
+    user_id: int, mal_id: int, status: MangaStatus, db: AsyncSession
+) -> UserMangaLink | None:
+    """
+    Update the reading status for a manga in a user's collection.
+    Returns the updated link, or None if the manga is not in the collection.
+    """
+    statement = (
+        update(UserMangaLink)
+        .where(
+            UserMangaLink.user_id == user_id,
+            UserMangaLink.manga_id == Manga.id,
+            Manga.mal_id == mal_id,
+        )
+        .values(status=status)
+        .returning(*_LINK_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(statement)
+    row = result.one_or_none()
     await db.commit()
-    return
+    return UserMangaLink(**row._mapping) if row else None
 
 
-async def update_user_manga_status(
-    link: UserMangaLink, status: MangaStatus, db: AsyncSession
-) -> UserMangaLink:
-    """Update the reading status for a manga in a user's collection."""
-    link.status = status
-    db.add(link)
+async def remove_manga_from_user_collection(
+    user_id: int, mal_id: int, db: AsyncSession
+) -> bool:
+    """Remove a manga from a user's collection. Returns False if it was not in it."""
+    statement = (
+        delete(UserMangaLink)
+        .where(
+            UserMangaLink.user_id == user_id,
+            UserMangaLink.manga_id == Manga.id,
+            Manga.mal_id == mal_id,
+        )
+        .returning(UserMangaLink.manga_id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(statement)
+    removed = result.one_or_none() is not None
     await db.commit()
-    await db.refresh(link)
-    return link
+    return removed
 
 
-async def get_user_collection_links(
-    user_id: int, db: AsyncSession
-) -> list[UserMangaLink]:
-    """Efficiently gets a user's collection with related manga info."""
+async def get_user_collection_with_metadata(
+    user_id: int,
+    db: AsyncSession,
+    status: MangaStatus | None = None,
+    newest_first: bool = True,
+    after: tuple[datetime.datetime, int] | None = None,
+    limit: int | None = None,
+) -> list[tuple[UserMangaLink, int, MangaMetadata | None]]:
+    """
+    A user's collection joined with the metadata mirror in one query.
+    Returns (link, mal_id, metadata) rows; metadata is None for titles not mirrored yet.
+    Rows are ordered by (added_at, manga_id); `after` is the (added_at, manga_id)
+    of the last row of the previous page, for keyset pagination.
+    """
     statement = (
-        select(UserMangaLink)
+        select(UserMangaLink, Manga.mal_id, MangaMetadata)
+        .join(Manga, Manga.id == UserMangaLink.manga_id)
+        .outerjoin(MangaMetadata, MangaMetadata.mal_id == Manga.mal_id)
         .where(UserMangaLink.user_id == user_id)
-        .options(selectinload(UserMangaLink.manga))
+    )
+    if status is not None:
+        statement = statement.where(UserMangaLink.status == status)
+
+    position = tuple_(UserMangaLink.added_at, UserMangaLink.manga_id)
+    if after is not None:
+        statement = statement.where(
+            position < tuple_(*after) if newest_first else position > tuple_(*after)
+        )
+    if newest_first:
+        statement = statement.order_by(
+            UserMangaLink.added_at.desc(), UserMangaLink.manga_id.desc()
+        )
+    else:
+        statement = statement.order_by(UserMangaLink.added_at, UserMangaLink.manga_id)
+    if limit is not None:
+        statement = statement.limit(limit)
+
+    result = await db.execute(statement)
+    return result.all()
+
+
+async def apply_user_collection_changes(
+    user_id: int,
+    adds: dict[int, MangaStatus],
+    updates: dict[int, MangaStatus],
+    removes: list[int],
+    db: AsyncSession,
+) -> tuple[set[int], set[int], set[int]]:
+    """
+    Applies many collection changes, keyed by mal_id, in one transaction with
+    multi-row statements: one upsert of the Manga rows and one link insert for
+    all adds, one UPDATE per target status, and one DELETE.
+    Returns the mal_ids actually added, updated and removed; anything missing
+    was already in (for adds) or not in (for updates and removes) the collection.
+    """
+    added: set[int] = set()
+    updated: set[int] = set()
+    removed: set[int] = set()
+
+    if removes:
+        statement = (
+            delete(UserMangaLink)
+            .where(
+                UserMangaLink.user_id == user_id,
+                UserMangaLink.manga_id == Manga.id,
+                Manga.mal_id.in_(removes),
+            )
+            .returning(Manga.mal_id)
+            .execution_options(synchronize_session=False)
+        )
+        removed = set((await db.execute(statement)).scalars().all())
+
+    if adds:
+        statement = pg_insert(Manga).values([{"mal_id": mal_id} for mal_id in adds])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Manga.mal_id], set_={"mal_id": statement.excluded.mal_id}
+        ).returning(Manga.id, Manga.mal_id)
+        mal_id_by_manga_id = dict((await db.execute(statement)).all())
+
+        statement = (
+            pg_insert(UserMangaLink)
+            .values(
+                [
+                    {"user_id": user_id, "manga_id": manga_id, "status": adds[mal_id]}
+                    for manga_id, mal_id in mal_id_by_manga_id.items()
+                ]
+            )
+            .on_conflict_do_nothing(
+                index_elements=[UserMangaLink.user_id, UserMangaLink.manga_id]
+            )
+            .returning(UserMangaLink.manga_id)
+        )
+        added = {
+            mal_id_by_manga_id[manga_id]
+            for manga_id in (await db.execute(statement)).scalars().all()
+        }
+
+    by_status: dict[MangaStatus, list[int]] = {}
+    for mal_id, status in updates.items():
+        by_status.setdefault(status, []).append(mal_id)
+    for status, mal_ids in by_status.items():
+        statement = (
+            update(UserMangaLink)
+            .where(
+                UserMangaLink.user_id == user_id,
+                UserMangaLink.manga_id == Manga.id,
+                Manga.mal_id.in_(mal_ids),
+            )
+            .values(status=status)
+            .returning(Manga.mal_id)
+            .execution_options(synchronize_session=False)
+        )
+        updated |= set((await db.execute(statement)).scalars().all())
+
+    await db.commit()
+    return added, updated, removed
+
+
+async def get_most_collected_mal_ids(limit: int, db: AsyncSession) -> list[int]:
+    """The mal_ids that appear in the most user collections, most collected first."""
+    statement = (
+        select(Manga.mal_id)
+        .join(UserMangaLink, UserMangaLink.manga_id == Manga.id)
+        .group_by(Manga.mal_id)
+        .order_by(func.count().desc(), Manga.mal_id)
+        .limit(limit)
     )
     result = await db.execute(statement)
     return result.scalars().all()
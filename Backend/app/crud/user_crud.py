@@ -21,6 +21,14 @@ async def create_user(user_in: UserCreate, db: AsyncSession) -> User:
     return new_user
 
 
+async def update_user_password(user: User, hashed_password: str, db: AsyncSession) -> User:
+    """Replaces a user's stored password hash."""
+    user.password = hashed_password
+    db.add(user)
+    await db.commit()
+    return user
+
+
 async def get_user_by_id(user_id: int, db: AsyncSession) -> User | None:
     """Fetches a single user by their ID."""
     statement = select(User).where(User.id == user_id)
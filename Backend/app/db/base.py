@@ -1,3 +1,3 @@
 from sqlmodel import SQLModel
-from app.models.manga_model import Manga, UserMangaLink
+from app.models.manga_model import Manga, MangaMetadata, UserMangaLink
 from app.models.user_model import User
\ No newline at end of file
@@ -8,4 +8,7 @@ redis_client = redis.from_url(
     f"{settings.REDIS_URL}",
     encoding="utf-8",
     decode_responses=True
-)
\ No newline at end of file
+)
+
+# Returns raw bytes; used by the cache, which stores pre-serialized JSON.
+redis_bytes_client = redis.from_url(f"{settings.REDIS_URL}")
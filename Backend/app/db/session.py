@@ -1,10 +1,83 @@
+import time
 from typing import AsyncGenerator
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util.queue import AsyncAdaptedQueue
 from app.core.config import settings
 
-engine = create_async_engine(str(settings.DATABASE_URL), echo=True, future=True)
+
+class _TimedQueue(AsyncAdaptedQueue):
+    """The pool's queue of idle connections, recording how long each blocking get waited."""
+
+    def get(self, block=True, timeout=None):
+        if not block:
+            # The pool tries this first while overflow is left; it never waits,
+            # and an empty queue just means a new connection gets opened.
+            return super().get(block, timeout)
+        started = time.perf_counter()
+        try:
+            return super().get(block, timeout)
+        finally:
+            _TimedQueuePool.record("wait", time.perf_counter() - started)
+
+
+class _TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The default async pool, recording the wait for an idle connection and the
+    time spent opening new ones separately.
+    """
+
+    _queue_class = _TimedQueue
+
+    timings = {
+        "wait": {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+        "connect": {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+    }
+
+    @classmethod
+    def record(cls, kind: str, seconds: float) -> None:
+        timing = cls.timings[kind]
+        timing["count"] += 1
+        timing["total_seconds"] += seconds
+        timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            self.record("connect", time.perf_counter() - started)
+
+
+def _timing_stats(kind: str) -> dict:
+    timing = _TimedQueuePool.timings[kind]
+    count = timing["count"]
+    return {
+        f"{kind}s": count,
+        f"avg_{kind}_ms": round(timing["total_seconds"] / count * 1000, 3) if count else 0.0,
+        f"max_{kind}_ms": round(timing["max_seconds"] * 1000, 3),
+    }
+
+
+engine = create_async_engine(
+    str(settings.DATABASE_URL),
+    echo=settings.DB_ECHO,
+    future=True,
+    poolclass=_TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        # Applied to every connection, so no single query can hold one for long.
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)},
+    },
+)
 
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -12,3 +85,20 @@ AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=F
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def get_pool_stats() -> dict:
+    """
+    Pool occupancy plus two timings: waits for an idle connection on the pool
+    queue, and opening new connections (including overflow ones).
+    """
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **_timing_stats("wait"),
+        **_timing_stats("connect"),
+    }
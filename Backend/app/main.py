@@ -1,21 +1,63 @@
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from app.core.logging_config import setup_logging
 import logging
 from app.core.config import settings
+from app.core import security
+from app.db.session import engine
 from starlette.middleware.cors import CORSMiddleware
 import time
-from app.api.v1.endpoints import user, manga, authentication
+from app.api.v1.endpoints import user, manga, authentication, stats
+from app.services import cache, cache_warmer, jikan_client
 
 # Call the setup function to apply our logging config
 setup_logging()
 logger = logging.getLogger("default")
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Opens shared clients on startup and closes them on shutdown."""
+    await jikan_client.start_client()
+    background_tasks = [asyncio.create_task(cache.run_invalidation_listener())]
+    if settings.CACHE_WARMER_ENABLED:
+        background_tasks.append(asyncio.create_task(cache_warmer.run_cache_warmer()))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await jikan_client.close_client()
+    security.shutdown_password_hasher()
+    await engine.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
+@app.exception_handler(jikan_client.JikanError)
+async def jikan_error_handler(request: Request, exc: jikan_client.JikanError):
+    """Upstream failures with nothing cached to fall back on."""
+    logger.warning(f"Jikan unavailable for {request.url.path}: {exc}")
+    unavailable = isinstance(exc, jikan_client.JikanUnavailableError)
+    return JSONResponse(
+        status_code=(
+            status.HTTP_503_SERVICE_UNAVAILABLE
+            if unavailable
+            else status.HTTP_502_BAD_GATEWAY
+        ),
+        content={"detail": "The manga data provider is unavailable, please try again shortly."},
+        headers=(
+            {"Retry-After": str(int(settings.JIKAN_BREAKER_RESET_SECONDS))}
+            if unavailable
+            else None
+        ),
+    )
+
+
 # Logging Middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -36,6 +78,7 @@ async def log_requests(request: Request, call_next):
 app.include_router(authentication.router, prefix=settings.API_V1_STR)
 app.include_router(user.router, prefix=settings.API_V1_STR)
 app.include_router(manga.router, prefix=settings.API_V1_STR)
+app.include_router(stats.router, prefix=settings.API_V1_STR)
 
 # Add CORS middleware (you can configure this more strictly later)
 app.add_middleware(
@@ -44,6 +87,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers only let the frontend read response headers listed here.
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # A simple root endpoint to test everything is working
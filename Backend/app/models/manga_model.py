@@ -1,7 +1,8 @@
 import datetime
 import enum
 from typing import Optional, List, TYPE_CHECKING
-from sqlmodel import Column, Enum, Field, SQLModel, func, Relationship
+from sqlalchemy import Index
+from sqlmodel import JSON, Column, DateTime, Enum, Field, SQLModel, Text, func, Relationship
 
 if TYPE_CHECKING:
     from app.models.user_model import User
@@ -22,6 +23,18 @@ class UserMangaLink(SQLModel, table=True):
     """
     Connects a User to a Manga and stores the user's status.
     """
+    # Keyset pagination over a user's collection, with and without a status filter.
+    __table_args__ = (
+        Index("ix_usermangalink_user_added", "user_id", "added_at", "manga_id"),
+        Index(
+            "ix_usermangalink_user_status_added",
+            "user_id",
+            "status",
+            "added_at",
+            "manga_id",
+        ),
+    )
+
     user_id: int = Field(foreign_key="user.id", primary_key=True)
     manga_id: int = Field(foreign_key="manga.id", primary_key=True)
 
@@ -46,4 +59,39 @@ class Manga(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     mal_id: int = Field(unique=True, index=True)
     
-    user_links: List["UserMangaLink"] = Relationship(back_populates="manga")
\ No newline at end of file
+    user_links: List["UserMangaLink"] = Relationship(back_populates="manga")
+
+
+# -----------------
+# 4. Local mirror of the Jikan metadata
+# -----------------
+class MangaMetadata(SQLModel, table=True):
+    """
+    The fields of MangaRead for a manga, as last fetched from Jikan.
+    Keyed by mal_id alone, so it can also hold titles nobody has collected yet.
+    """
+    mal_id: int = Field(primary_key=True)
+    title: str
+    status: Optional[str] = None
+    cover_url: Optional[str] = None
+    author: Optional[str] = None
+    year: Optional[str] = None
+    rating: Optional[float] = None
+    tags: List[str] = Field(
+        default_factory=list,
+        sa_column=Column(JSON, nullable=False, server_default="[]")
+    )
+    description: Optional[str] = Field(default=None, sa_column=Column(Text))
+    alternative_title: Optional[str] = None
+    # Normalized title, alternative title, author and tags; what local search matches against.
+    search_text: str = Field(
+        default="",
+        sa_column=Column(Text, nullable=False, server_default="")
+    )
+
+    fetched_at: datetime.datetime = Field(
+        default=None,
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+        )
+    )
@@ -1,9 +1,18 @@
 # app/schemas/manga_schema.py
 
-from pydantic import BaseModel
+import enum
+
+from pydantic import BaseModel, Field, field_validator
+from app.core.config import settings
 from app.models.manga_model import MangaStatus
 
 
+class CollectionSort(str, enum.Enum):
+    """Order of a user's collection, by when each manga was added."""
+    NEWEST = "newest"
+    OLDEST = "oldest"
+
+
 # Schema for adding a manga to a user's collection.
 class MangaCreate(BaseModel):
     mal_id: int
@@ -28,6 +37,67 @@ class MangaRead(BaseModel):
     alternative_title: str | None = None
 
 
+class CollectionAction(str, enum.Enum):
+    ADD = "add"
+    UPDATE = "update"
+    REMOVE = "remove"
+
+
+# One change in a bulk collection request. `status` is required to update and
+# optional to add (defaults to planned).
+class CollectionOperation(BaseModel):
+    action: CollectionAction
+    mal_id: int
+    status: MangaStatus | None = None
+
+
+class CollectionBulkRequest(BaseModel):
+    operations: list[CollectionOperation] = Field(
+        max_length=settings.COLLECTION_BULK_MAX_OPERATIONS
+    )
+
+
+class CollectionOperationResult(BaseModel):
+    action: CollectionAction
+    mal_id: int
+    # "added", "updated", "removed", "already_in_collection", "not_in_collection",
+    # "duplicate" (the mal_id appears earlier in the request) or "invalid".
+    outcome: str
+    status: MangaStatus | None = None
+
+
+class CollectionBulkResult(BaseModel):
+    results: list[CollectionOperationResult]
+
+
+# Schemas for requesting details for many manga at once: comma-separated ids
+# in the query string, or a JSON body for longer lists.
+class MangaDetailsBatchQuery(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=settings.MANGA_DETAILS_BATCH_MAX_IDS)
+
+    @field_validator("ids", mode="before")
+    @classmethod
+    def split_ids(cls, value):
+        if isinstance(value, str):
+            return [mal_id.strip() for mal_id in value.split(",") if mal_id.strip()]
+        return value
+
+
+class MangaDetailsBatchRequest(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=settings.MANGA_DETAILS_BATCH_POST_MAX_IDS)
+
+
+class MangaDetailsError(BaseModel):
+    mal_id: int
+    # "not_found" if Jikan has no such manga, "unavailable" if it could not be fetched right now.
+    error: str
+
+
+class MangaDetailsBatch(BaseModel):
+    results: list[MangaRead] = []
+    errors: list[MangaDetailsError] = []
+
+
 class UserCollectionManga(BaseModel):
     mal_id: int
     title: str
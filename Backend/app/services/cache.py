@@ -0,0 +1,865 @@
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Awaitable, Callable, NamedTuple
+
+import orjson
+
+from app.core.config import settings
+from app.db.redis_conn import redis_bytes_client as redis
+from app.utils import compression
+from app.utils.cache_keys import cache_key
+from app.utils.lru_cache import TTLCache
+
+logger = logging.getLogger("default")
+
+# A loader returns None when the upstream says the thing does not exist; that
+# answer is cached briefly as a negative entry. Transient failures must raise.
+Loader = Callable[[], Awaitable[Any]]
+EmptyCheck = Callable[[Any], bool]
+
+
+def _is_falsy(value: Any) -> bool:
+    return not value
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Soft and hard TTLs, in seconds, for one key family."""
+
+    soft_ttl: int
+    hard_ttl: int
+
+
+# Key families are the prefix before the first ':' of a cache key.
+POLICIES: dict[str, CachePolicy] = {
+    "manga_details": CachePolicy(
+        settings.CACHE_DETAILS_SOFT_TTL, settings.CACHE_DETAILS_HARD_TTL
+    ),
+    "top_manga": CachePolicy(settings.CACHE_TOP_SOFT_TTL, settings.CACHE_TOP_HARD_TTL),
+    "search": CachePolicy(
+        settings.CACHE_SEARCH_SOFT_TTL, settings.CACHE_SEARCH_HARD_TTL
+    ),
+    "manga_recommendations": CachePolicy(
+        settings.CACHE_RECOMMENDATIONS_SOFT_TTL,
+        settings.CACHE_RECOMMENDATIONS_HARD_TTL,
+    ),
+    "genre": CachePolicy(settings.CACHE_GENRE_SOFT_TTL, settings.CACHE_GENRE_HARD_TTL),
+    "combined_news": CachePolicy(
+        settings.CACHE_NEWS_SOFT_TTL, settings.CACHE_NEWS_HARD_TTL
+    ),
+    "manga_list": CachePolicy(settings.CACHE_LIST_SOFT_TTL, settings.CACHE_LIST_HARD_TTL),
+}
+
+
+class CacheTarget(NamedTuple):
+    """A cache key plus what it takes to fill it."""
+
+    key: str
+    loader: Loader
+    is_empty: EmptyCheck = _is_falsy
+    # Roughly how many upstream calls one load makes, for budgeting refreshes.
+    cost: int = 1
+
+
+class CacheEntry:
+    """
+    A cached value plus the timestamps needed for stale-while-revalidate.
+
+    `raw` is the value as JSON bytes, exactly as stored, so it can be sent as
+    a response body as is; `data` is decoded from it on first access.
+    """
+
+    def __init__(
+        self,
+        raw: bytes,
+        soft_expires_at: float,
+        refreshed_at: float,
+        hard_expires_at: float = float("inf"),
+        etag: str | None = None,
+    ):
+        self.raw = raw
+        self.soft_expires_at = soft_expires_at
+        self.refreshed_at = refreshed_at
+        # Past this point the entry is only kept around to be served if a refresh fails.
+        self.hard_expires_at = hard_expires_at
+        if etag:
+            self.etag = etag
+
+    @cached_property
+    def data(self) -> Any:
+        return orjson.loads(self.raw)
+
+    @cached_property
+    def etag(self) -> str:
+        """Strong ETag: a hash of the payload bytes, stored with the entry."""
+        return f'"{hashlib.blake2b(self.raw, digest_size=16).hexdigest()}"'
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() >= self.soft_expires_at
+
+    @property
+    def is_expired(self) -> bool:
+        return time.time() >= self.hard_expires_at
+
+    @property
+    def is_negative(self) -> bool:
+        """A remembered "not found": the loader returned None."""
+        return self.raw == NEGATIVE_PAYLOAD
+
+
+NEGATIVE_PAYLOAD = b"null"
+
+
+# --- L1 (in-process) tier ---
+
+# Workers publish the keys they write here so the others drop their L1 copy.
+INVALIDATION_CHANNEL = "cache:invalidate"
+WORKER_ID = uuid.uuid4().hex
+
+_l1 = TTLCache(maxsize=settings.CACHE_L1_MAX_ENTRIES, ttl=settings.CACHE_L1_TTL_SECONDS)
+_l1_families = frozenset(settings.CACHE_L1_FAMILIES) if settings.CACHE_L1_ENABLED else frozenset()
+
+
+def _family(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+# --- Namespaces ---
+
+# Every family has a generation counter in Redis. Keys are stored under
+# "{family}:v{generation}:{rest}", so bumping the counter invalidates the whole
+# family at once; the old keys are never read again and age out on their TTL.
+GENERATION_KEY_PREFIX = "cache:gen:"
+
+_generations: dict[str, int] = {}
+_generations_loaded_at = float("-inf")
+
+
+def _generation_key(family: str) -> str:
+    return f"{GENERATION_KEY_PREFIX}{family}"
+
+
+async def _load_generations() -> None:
+    global _generations_loaded_at
+    # Set first so a Redis outage does not turn every cache read into a retry.
+    _generations_loaded_at = time.monotonic()
+    families = list(POLICIES)
+    try:
+        values = await redis.mget([_generation_key(family) for family in families])
+    except Exception as e:
+        logger.warning(f"Could not read cache generations, keeping the last known: {e!r}")
+        return
+    for family, value in zip(families, values):
+        _generations[family] = int(value or 0)
+
+
+async def _versioned(key: str) -> str:
+    """Maps a logical cache key to the key it is stored under in the current generation."""
+    if time.monotonic() - _generations_loaded_at >= settings.CACHE_GENERATION_REFRESH_SECONDS:
+        await _load_generations()
+    family, _, rest = key.partition(":")
+    generation = _generations.get(family, 0)
+    # Generation 0 keeps the unprefixed keys written before namespaces existed.
+    return f"{family}:v{generation}:{rest}" if generation else key
+
+
+async def get_generations() -> dict[str, int]:
+    """Current generation of every family, read straight from Redis."""
+    await _load_generations()
+    return {family: _generations.get(family, 0) for family in POLICIES}
+
+
+async def invalidate_family(family: str) -> int:
+    """
+    Invalidates every key of a family in O(1) by bumping its generation.
+    Returns the new generation.
+    """
+    if family not in POLICIES:
+        raise ValueError(f"Unknown cache family: {family}")
+    generation = await redis.incr(_generation_key(family))
+    _generations[family] = generation
+    await _publish_invalidation(_generation_key(family))
+    return generation
+
+
+async def invalidate_key(key: str) -> bool:
+    """Deletes one logical key in the current generation. Returns whether it existed."""
+    stored_key = await _versioned(key)
+    deleted = await redis.delete(stored_key)
+    _l1.delete(stored_key)
+    await _publish_invalidation(stored_key)
+    return bool(deleted)
+
+
+# --- Title tags ---
+
+# Every stored list that contains a title is recorded in a sorted set per
+# mal_id, scored by when the list leaves Redis, so invalidating the title can
+# drop those lists too instead of letting them serve the old data until their
+# TTL runs out. Members past their score are trimmed on every write, so a set
+# only ever holds lists that still exist.
+TAG_KEY_PREFIX = "cache:tags:manga:"
+# Families whose entries are lists of titles (or pages of them); anything else,
+# e.g. news items that carry their own mal_ids, is never tagged.
+TAGGED_FAMILIES = frozenset(
+    {"top_manga", "search", "genre", "manga_recommendations", "manga_list"}
+)
+# Long enough to outlive any list that gets tagged.
+_TAG_TTL = (
+    max(policy.hard_ttl for policy in POLICIES.values()) + settings.CACHE_STALE_IF_ERROR_SECONDS
+)
+
+
+def _tag_key(mal_id: int) -> str:
+    return f"{TAG_KEY_PREFIX}{mal_id}"
+
+
+def _tagged_mal_ids(key: str, entry: CacheEntry) -> set[int]:
+    """The titles a list entry contains: a list of titles, or a page of them under "mangas"."""
+    if _family(key) not in TAGGED_FAMILIES or entry.is_negative:
+        return set()
+    items = entry.data
+    if isinstance(items, dict):
+        items = items.get("mangas")
+    if not isinstance(items, list):
+        return set()
+    return {item["mal_id"] for item in items if isinstance(item, dict) and item.get("mal_id")}
+
+
+async def get_tagged_keys(mal_id: int) -> list[str]:
+    """Stored keys of the cached lists that contain a title and are still in Redis."""
+    keys = await redis.zrangebyscore(_tag_key(mal_id), time.time(), "+inf")
+    return sorted(key.decode() for key in keys)
+
+
+async def invalidate_tagged(mal_id: int) -> int:
+    """
+    Deletes every cached list that contains a title, in every generation it
+    was tagged in, and drops them from each worker's L1. Returns how many
+    lists were still in Redis.
+    """
+    stored_keys = await get_tagged_keys(mal_id)
+    if not stored_keys:
+        return 0
+    pipeline = redis.pipeline(transaction=False)
+    pipeline.delete(*stored_keys)
+    pipeline.delete(_tag_key(mal_id))
+    for stored_key in stored_keys:
+        _l1.delete(stored_key)
+        pipeline.publish(INVALIDATION_CHANNEL, f"{WORKER_ID}:{stored_key}")
+    deleted, *_ = await pipeline.execute()
+    return deleted
+
+
+def make_entry(key: str, value: Any) -> CacheEntry:
+    """Serializes a freshly loaded value into an entry with this family's TTLs."""
+    policy = POLICIES[_family(key)]
+    now = time.time()
+    entry = CacheEntry(
+        orjson.dumps(value),
+        soft_expires_at=now + policy.soft_ttl,
+        refreshed_at=now,
+        hard_expires_at=now + policy.hard_ttl,
+    )
+    entry.data = value  # no need to decode what we just encoded
+    return entry
+
+
+def make_negative_entry() -> CacheEntry:
+    """An entry recording that the loader found nothing, kept for CACHE_NEGATIVE_TTL."""
+    now = time.time()
+    expires_at = now + settings.CACHE_NEGATIVE_TTL
+    entry = CacheEntry(NEGATIVE_PAYLOAD, expires_at, now, expires_at)
+    entry.data = None
+    return entry
+
+
+# --- Codec ---
+# Stored format: a version byte, a compressor id byte, a one-line JSON header,
+# then the payload. Once decompressed the payload is always JSON, so it can be
+# sent as a response body as is. Entries written before the version byte
+# existed start with '{' or another JSON token and can still be read.
+
+FORMAT_VERSION = 2
+# List families in CACHE_REF_FAMILIES store mal_ids pointing into this family.
+REF_FAMILY = "manga_details"
+
+_compressor, _decompressors = compression.get_compressors(
+    settings.CACHE_COMPRESSION, settings.CACHE_COMPRESSION_LEVEL
+)
+_ref_families = frozenset(settings.CACHE_REF_FAMILIES) - {REF_FAMILY}
+
+
+@dataclass
+class _CodecStats:
+    encoded: int = 0
+    decoded: int = 0
+    encode_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    # Size of the JSON payloads versus what was actually written to Redis.
+    payload_bytes: int = 0
+    stored_bytes: int = 0
+    # Details entries a list stored by reference had to create for its items.
+    ref_writes: int = 0
+    ref_bytes: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "encoded": self.encoded,
+            "decoded": self.decoded,
+            "avg_encode_ms": (
+                round(self.encode_seconds / self.encoded * 1000, 3) if self.encoded else 0.0
+            ),
+            "avg_decode_ms": (
+                round(self.decode_seconds / self.decoded * 1000, 3) if self.decoded else 0.0
+            ),
+            "payload_bytes": self.payload_bytes,
+            "stored_bytes": self.stored_bytes,
+            "ref_writes": self.ref_writes,
+            "ref_bytes": self.ref_bytes,
+            "bytes_saved": self.payload_bytes - self.stored_bytes - self.ref_bytes,
+        }
+
+
+_codec_stats: dict[str, _CodecStats] = defaultdict(_CodecStats)
+
+
+@dataclass
+class _LookupStats:
+    """How reads of one key family were answered."""
+
+    hits: int = 0
+    # Served past the soft TTL while a refresh runs in the background.
+    stale_hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+
+    def record(self, entry: CacheEntry | None) -> None:
+        if entry is None or entry.is_expired:
+            self.misses += 1
+        elif entry.is_negative:
+            self.negative_hits += 1
+        elif entry.is_stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+
+    def as_dict(self) -> dict:
+        answered = self.hits + self.stale_hits + self.negative_hits
+        total = answered + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": round(answered / total, 3) if total else 0.0,
+        }
+
+
+_lookup_stats: dict[str, _LookupStats] = defaultdict(_LookupStats)
+
+
+class _Refs(NamedTuple):
+    """A list entry stored as mal_ids, to be rebuilt from manga_details entries."""
+
+    mal_ids: list[int]
+    soft_expires_at: float
+    refreshed_at: float
+    hard_expires_at: float
+
+
+def _split_refs(key: str, entry: CacheEntry) -> tuple[bytes, dict[str, CacheEntry]] | None:
+    """
+    For families stored by reference: the mal_ids as JSON plus one details
+    entry per item. None if the value is not a list of titles.
+    """
+    if _family(key) not in _ref_families or not isinstance(entry.data, list):
+        return None
+    items = entry.data
+    if not all(isinstance(item, dict) and item.get("mal_id") for item in items):
+        return None
+    referenced = {}
+    for item in items:
+        ref_key = cache_key(REF_FAMILY, item["mal_id"])
+        referenced[ref_key] = make_entry(ref_key, item)
+    return orjson.dumps([item["mal_id"] for item in items]), referenced
+
+
+def _encode(
+    key: str, entry: CacheEntry, record_stats: bool = True
+) -> tuple[bytes, dict[str, CacheEntry]]:
+    """
+    Serializes an entry for Redis. Also returns the entries it references,
+    which have to be written along with it.
+    """
+    started = time.perf_counter()
+    header = {
+        "soft": entry.soft_expires_at,
+        "hard": entry.hard_expires_at,
+        "at": entry.refreshed_at,
+    }
+    payload, referenced = entry.raw, {}
+    if split := _split_refs(key, entry):
+        payload, referenced = split
+        header["refs"] = REF_FAMILY
+    else:
+        # A list rebuilt from references hashes its rebuilt bytes instead.
+        header["etag"] = entry.etag
+
+    compressor = (
+        _compressor
+        if len(payload) >= settings.CACHE_COMPRESSION_MIN_BYTES
+        else compression.NONE
+    )
+    # Compact JSON never contains a raw newline, so the header ends at the first one.
+    data = (
+        bytes((FORMAT_VERSION, compressor.id))
+        + orjson.dumps(header)
+        + b"\n"
+        + compressor.compress(payload)
+    )
+
+    if record_stats:
+        stats = _codec_stats[_family(key)]
+        stats.encoded += 1
+        stats.encode_seconds += time.perf_counter() - started
+        stats.payload_bytes += len(entry.raw)
+        stats.stored_bytes += len(data)
+    return data, referenced
+
+
+def _redis_ttl(key: str, entry: CacheEntry) -> int:
+    if entry.is_negative:
+        return settings.CACHE_NEGATIVE_TTL
+    return POLICIES[_family(key)].hard_ttl + settings.CACHE_STALE_IF_ERROR_SECONDS
+
+
+def _decode(key: str, raw: bytes) -> CacheEntry | _Refs | None:
+    started = time.perf_counter()
+    decoded = _parse(key, raw)
+    stats = _codec_stats[_family(key)]
+    stats.decoded += 1
+    stats.decode_seconds += time.perf_counter() - started
+    return decoded
+
+
+def _parse(key: str, raw: bytes) -> CacheEntry | _Refs | None:
+    if raw[0] == FORMAT_VERSION:
+        decompressor = _decompressors.get(raw[1])
+        if decompressor is None:
+            # Written by a worker with a compressor this one lacks; treat it as a miss.
+            logger.warning(f"Cannot decompress cache entry {key} (compressor id {raw[1]})")
+            return None
+        header, _, body = raw[2:].partition(b"\n")
+        meta = orjson.loads(header)
+        payload = decompressor.decompress(body)
+        hard_expires_at = meta.get("hard") or float("inf")
+        if meta.get("refs"):
+            return _Refs(orjson.loads(payload), meta["soft"], meta["at"], hard_expires_at)
+        return CacheEntry(payload, meta["soft"], meta["at"], hard_expires_at, meta.get("etag"))
+
+    # Older formats: a JSON header line followed by the payload, a single JSON
+    # document {"data", "soft", "at"[, "hard"]}, or the bare value from before
+    # soft TTLs existed (served, but refreshed right away).
+    header, newline, payload = raw.partition(b"\n")
+    if newline:
+        meta = orjson.loads(header)
+        return CacheEntry(
+            payload,
+            meta["soft"],
+            meta["at"],
+            meta.get("hard") or float("inf"),
+            meta.get("etag"),
+        )
+
+    document = orjson.loads(raw)
+    if isinstance(document, dict) and {"data", "soft", "at"} <= document.keys():
+        entry = CacheEntry(
+            orjson.dumps(document["data"]),
+            document["soft"],
+            document["at"],
+            document.get("hard", float("inf")),
+        )
+        entry.data = document["data"]
+        return entry
+    entry = CacheEntry(raw, soft_expires_at=0, refreshed_at=0)
+    entry.data = document
+    return entry
+
+
+async def _materialize(
+    decoded: CacheEntry | _Refs | None, record_stats: bool = True
+) -> CacheEntry | None:
+    """
+    Rebuilds a list stored by reference from the entries it points to.
+
+    If a referenced title was evicted, invalidated or is gone, the list is
+    rebuilt without it and marked expired: readers reload it, and only serve
+    the partial list if that reload fails.
+    """
+    if not isinstance(decoded, _Refs):
+        return decoded
+    keys = [cache_key(REF_FAMILY, mal_id) for mal_id in decoded.mal_ids]
+    found = await get_many(keys, record_stats=record_stats)
+    present = [found[key] for key in keys if key in found and not found[key].is_negative]
+    raw = b"[" + b",".join(entry.raw for entry in present) + b"]"
+    if len(present) < len(keys):
+        return CacheEntry(raw, 0, decoded.refreshed_at, 0)
+    return CacheEntry(
+        raw, decoded.soft_expires_at, decoded.refreshed_at, decoded.hard_expires_at
+    )
+
+
+async def _read(key: str) -> CacheEntry | None:
+    """
+    Reads a key from L1, falling back to Redis.
+    Values served from L1 are shared between callers and must be treated as read-only.
+    """
+    stored_key = await _versioned(key)
+    use_l1 = _family(key) in _l1_families
+    if use_l1 and (entry := _l1.get(stored_key)) is not None:
+        return entry
+    if raw := await redis.get(stored_key):
+        entry = await _materialize(_decode(key, raw))
+        if entry and use_l1 and not entry.is_expired:
+            _l1.set(stored_key, entry)
+        return entry
+    return None
+
+
+async def _write(key: str, entry: CacheEntry) -> None:
+    await set_many({key: entry})
+
+
+async def _publish_invalidation(key: str) -> None:
+    try:
+        await redis.publish(INVALIDATION_CHANNEL, f"{WORKER_ID}:{key}")
+    except Exception as e:
+        # Other workers still converge once their L1 TTL runs out.
+        logger.warning(f"Could not publish cache invalidation for {key}: {e!r}")
+
+
+async def run_invalidation_listener() -> None:
+    """
+    Drops L1 entries that another worker has rewritten, and reloads the
+    generations when another worker bumps one.
+    Runs for the lifetime of the app and reconnects if Redis goes away.
+    """
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Anything may have changed while we were not listening.
+            _l1.clear()
+            await _load_generations()
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                sender, _, key = message["data"].decode().partition(":")
+                if sender == WORKER_ID:
+                    continue
+                if key.startswith(GENERATION_KEY_PREFIX):
+                    await _load_generations()
+                else:
+                    _l1.delete(key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener error, reconnecting: {e!r}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+async def get_many(keys: list[str], record_stats: bool = True) -> dict[str, CacheEntry]:
+    """
+    Reads many keys with L1 lookups plus a single Redis MGET for the rest.
+    Missing keys are left out of the result. Each key counts towards its
+    family's lookup stats unless `record_stats` is false (background readers).
+    """
+    found: dict[str, CacheEntry] = {}
+    remote_keys = []
+    for key in keys:
+        stored_key = await _versioned(key)
+        if _family(key) in _l1_families and (entry := _l1.get(stored_key)) is not None:
+            found[key] = entry
+        else:
+            remote_keys.append((key, stored_key))
+
+    if remote_keys:
+        values = await redis.mget([stored_key for _, stored_key in remote_keys])
+        for (key, stored_key), raw in zip(remote_keys, values):
+            if raw and (entry := await _materialize(_decode(key, raw), record_stats)):
+                found[key] = entry
+                if _family(key) in _l1_families and not entry.is_expired:
+                    _l1.set(stored_key, entry)
+
+    if record_stats:
+        for key in keys:
+            _lookup_stats[_family(key)].record(found.get(key))
+    return found
+
+
+async def set_many(entries: dict[str, CacheEntry]) -> None:
+    """
+    Writes many entries in one pipelined round trip, along with any details
+    entries that lists stored by reference point to. Those are only written
+    where no details entry exists yet, so a list never overwrites fuller
+    details or extends their TTL.
+    """
+    if not entries:
+        return
+    writes: dict[str, tuple[CacheEntry, bytes]] = {}
+    # Referenced details entry -> (entry, stored bytes, family of the list that needs it)
+    ref_writes: dict[str, tuple[CacheEntry, bytes, str]] = {}
+    for key, entry in entries.items():
+        data, referenced = _encode(key, entry)
+        for ref_key, ref_entry in referenced.items():
+            ref_data = _encode(ref_key, ref_entry, record_stats=False)[0]
+            ref_writes[ref_key] = (ref_entry, ref_data, _family(key))
+        writes[key] = (entry, data)
+    for key in writes:
+        ref_writes.pop(key, None)
+
+    pipeline = redis.pipeline(transaction=False)
+    for key, (entry, data) in writes.items():
+        stored_key = await _versioned(key)
+        pipeline.set(stored_key, data, ex=_redis_ttl(key, entry))
+        if _family(key) in _l1_families:
+            _l1.set(stored_key, entry)
+            pipeline.publish(INVALIDATION_CHANNEL, f"{WORKER_ID}:{stored_key}")
+        if mal_ids := _tagged_mal_ids(key, entry):
+            now = time.time()
+            leaves_redis_at = now + _redis_ttl(key, entry)
+            for mal_id in mal_ids:
+                pipeline.zadd(_tag_key(mal_id), {stored_key: leaves_redis_at})
+                pipeline.zremrangebyscore(_tag_key(mal_id), "-inf", now)
+                pipeline.expire(_tag_key(mal_id), _TAG_TTL)
+    for ref_key, (ref_entry, ref_data, _) in ref_writes.items():
+        pipeline.set(await _versioned(ref_key), ref_data, ex=_redis_ttl(ref_key, ref_entry), nx=True)
+    results = await pipeline.execute()
+
+    # The NX writes come last; count the ones that happened against the list's family.
+    ref_results = results[len(results) - len(ref_writes):]
+    for (_, ref_data, list_family), written in zip(ref_writes.values(), ref_results):
+        if written:
+            stats = _codec_stats[list_family]
+            stats.ref_writes += 1
+            stats.ref_bytes += len(ref_data)
+
+
+def get_stats() -> dict:
+    return {
+        "l1": _l1.stats(),
+        "l1_families": sorted(_l1_families),
+        "generations": {family: _generations.get(family, 0) for family in POLICIES},
+        "negative_ttl": settings.CACHE_NEGATIVE_TTL,
+        "lookups": {family: stats.as_dict() for family, stats in sorted(_lookup_stats.items())},
+        "codec": {
+            "compression": _compressor.name,
+            "compression_min_bytes": settings.CACHE_COMPRESSION_MIN_BYTES,
+            "ref_families": sorted(_ref_families),
+            "families": {family: stats.as_dict() for family, stats in _codec_stats.items()},
+        },
+    }
+
+
+# --- Request coalescing ---
+
+# Deletes the lock only if we still own it, so an expired lease never
+# releases a lock that another worker has since acquired.
+_RELEASE_LOCK_SCRIPT = redis.register_script(
+    """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+)
+
+# Loads currently running in this worker, keyed by cache key.
+_in_flight: dict[str, asyncio.Future] = {}
+# Strong references to background refreshes so they are not garbage collected.
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def single_flight(key: str, loader: Loader) -> Any:
+    """
+    Runs `loader` once per key at a time within this worker.
+    Concurrent callers for the same key await the same in-flight coroutine.
+    Loads registered under a cache key must resolve to a CacheEntry or None.
+    """
+    future = _in_flight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(loader())
+        _in_flight[key] = future
+        future.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # Shield so one cancelled caller does not cancel the load for everyone else.
+    return await asyncio.shield(future)
+
+
+async def _acquire_lock(key: str) -> str | None:
+    token = uuid.uuid4().hex
+    acquired = await redis.set(
+        f"lock:{key}",
+        token,
+        nx=True,
+        px=int(settings.CACHE_LOCK_LEASE_SECONDS * 1000),
+    )
+    return token if acquired else None
+
+
+async def _release_lock(key: str, token: str) -> None:
+    await _RELEASE_LOCK_SCRIPT(keys=[f"lock:{key}"], args=[token])
+
+
+async def _wait_for_entry(key: str) -> CacheEntry | None:
+    """Polls for a value another worker is filling in, for at most one lease."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.CACHE_LOCK_LEASE_SECONDS
+    while loop.time() < deadline:
+        await asyncio.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+        if (entry := await _read(key)) and not entry.is_expired:
+            return entry
+    return None
+
+
+async def _load(key: str, loader: Loader, is_empty: EmptyCheck) -> CacheEntry | None:
+    """Blocking load for a key that is missing or past its hard TTL."""
+    token = await _acquire_lock(key)
+    if token is None:
+        if entry := await _wait_for_entry(key):
+            return entry
+        # The lock holder died or gave up; load it ourselves.
+    try:
+        # The previous lock holder may have filled the key just before we got the lock.
+        if token is not None and (entry := await _read(key)) and not entry.is_stale:
+            return entry
+        value = await loader()
+        if value is None:
+            entry = make_negative_entry()
+            await _write(key, entry)
+            return entry
+        entry = make_entry(key, value)
+        # Empty results are never written, so a bad upstream answer cannot stick for hours.
+        if not is_empty(value):
+            await _write(key, entry)
+        return entry
+    finally:
+        if token is not None:
+            await _release_lock(key, token)
+
+
+async def _refresh(key: str, loader: Loader, is_empty: EmptyCheck) -> None:
+    """Background refresh of a stale key. Skipped if another worker holds the lock."""
+    token = await _acquire_lock(key)
+    if token is None:
+        return
+    try:
+        value = await loader()
+        if value is None:
+            await _write(key, make_negative_entry())
+        elif not is_empty(value):
+            await _write(key, make_entry(key, value))
+    finally:
+        await _release_lock(key, token)
+
+
+def _log_refresh_error(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and (error := task.exception()):
+        logger.warning(f"Background cache refresh failed: {error!r}")
+
+
+def schedule_refresh(key: str, loader: Loader, is_empty: EmptyCheck = _is_falsy) -> None:
+    """Refreshes a stale key in the background, at most once at a time per worker."""
+    # Refreshes get their own in-flight slot so a blocking reader never awaits
+    # a refresh that was skipped because another worker held the lock.
+    refresh_key = f"refresh:{key}"
+    if key in _in_flight or refresh_key in _in_flight:
+        return
+    task = asyncio.create_task(single_flight(refresh_key, lambda: _refresh(key, loader, is_empty)))
+    _background_tasks.add(task)
+    task.add_done_callback(_log_refresh_error)
+
+
+async def load_entry(key: str, loader: Loader) -> CacheEntry | None:
+    """
+    Runs `loader` for a cache key through single flight without writing the
+    result, for callers that batch their own writes (see set_many).
+    Returns None if the loader found nothing.
+    """
+
+    async def _load_without_write() -> CacheEntry | None:
+        value = await loader()
+        return None if value is None else make_entry(key, value)
+
+    entry = await single_flight(key, _load_without_write)
+    return None if entry is None or entry.is_negative else entry
+
+
+async def get_or_load_entry(
+    key: str, loader: Loader, is_empty: EmptyCheck = _is_falsy
+) -> CacheEntry | None:
+    """
+    Cache-aside read with stale-while-revalidate and request coalescing.
+
+    Fresh entries are returned as is. Entries past their soft TTL are returned
+    immediately and refreshed in the background. Only an entry past its hard
+    TTL blocks: then one coroutine per worker calls `loader`, and a short
+    Redis lock lets a single worker refresh the key while the others wait for
+    its result. If that load fails, the expired entry is served instead.
+    Results for which `is_empty` is true are returned but never cached.
+    Returns None when the loader found nothing; that answer is cached for
+    CACHE_NEGATIVE_TTL, so repeated lookups for it stay off the upstream.
+    """
+    entry = await _read(key)
+    _lookup_stats[_family(key)].record(entry)
+    if entry and not entry.is_expired:
+        if entry.is_negative:
+            return None
+        if entry.is_stale:
+            schedule_refresh(key, loader, is_empty)
+        return entry
+
+    try:
+        loaded = await single_flight(key, lambda: _load(key, loader, is_empty))
+    except Exception as e:
+        if entry is None:
+            raise
+        logger.warning(f"Serving expired cache entry for {key}: {e!r}")
+        loaded = entry
+    return None if loaded is None or loaded.is_negative else loaded
+
+
+async def get_or_load_target(target: CacheTarget) -> CacheEntry | None:
+    return await get_or_load_entry(target.key, target.loader, target.is_empty)
+
+
+async def peek(key: str) -> CacheEntry | None:
+    """Reads a key without loading or refreshing it."""
+    return await _read(key)
+
+
+async def refresh(target: CacheTarget) -> None:
+    """
+    Reloads a target now and writes it back, sharing the in-flight slot and
+    Redis lock of background refreshes. Does nothing if another worker holds the lock.
+    """
+    await single_flight(
+        f"refresh:{target.key}",
+        lambda: _refresh(target.key, target.loader, target.is_empty),
+    )
+
+
+async def get_or_load(key: str, loader: Loader, is_empty: EmptyCheck = _is_falsy) -> Any:
+    """Like get_or_load_entry, but returns the decoded value."""
+    entry = await get_or_load_entry(key, loader, is_empty)
+    return entry.data if entry else None
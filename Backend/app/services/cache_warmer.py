@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.crud import manga_crud
+from app.db.redis_conn import redis_client as redis
+from app.db.session import AsyncSessionLocal
+from app.services import cache, manga_service
+
+logger = logging.getLogger("default")
+
+# Held for one interval by whichever worker runs the cycle.
+WARMER_LOCK_KEY = "lock:cache_warmer"
+
+
+def _catalogue_targets() -> list[cache.CacheTarget]:
+    """The home page and catalogue keys, in the order they should be warmed."""
+    targets = [
+        manga_service.top_manga_cache_target(None if filter == "popular" else filter)
+        for filter in settings.CACHE_WARMER_TOP_FILTERS
+    ]
+    targets.append(manga_service.recommendations_cache_target())
+    targets.append(manga_service.news_cache_target())
+    targets += [
+        manga_service.genre_cache_target(genre_id)
+        for genre_id in settings.CACHE_WARMER_GENRE_IDS
+    ]
+    targets += [
+        manga_service.manga_list_cache_target(
+            page, settings.CACHE_WARMER_LIST_PAGE_SIZE, {}
+        )
+        for page in range(1, settings.CACHE_WARMER_LIST_PAGES + 1)
+    ]
+    return targets
+
+
+async def _most_collected_targets() -> list[cache.CacheTarget]:
+    async with AsyncSessionLocal() as db:
+        mal_ids = await manga_crud.get_most_collected_mal_ids(
+            settings.CACHE_WARMER_TOP_COLLECTED, db=db
+        )
+    return [manga_service.manga_details_cache_target(mal_id) for mal_id in mal_ids]
+
+
+def _needs_warming(entry: cache.CacheEntry | None) -> bool:
+    # Anything that would go stale before the next cycle is refreshed now.
+    horizon = time.time() + settings.CACHE_WARMER_INTERVAL_SECONDS * 1.5
+    if entry is not None and entry.is_negative:
+        # Known to be missing upstream; not worth spending the Jikan budget on.
+        return False
+    return entry is None or entry.soft_expires_at <= horizon
+
+
+async def warm_cache_once() -> int:
+    """
+    Runs one warming cycle and returns the number of keys refreshed.
+    Stops once the next refresh would exceed CACHE_WARMER_JIKAN_BUDGET.
+    """
+    targets = _catalogue_targets() + await _most_collected_targets()
+    # Not a user read, so it stays out of the hit-ratio stats.
+    entries = await cache.get_many([target.key for target in targets], record_stats=False)
+
+    budget = settings.CACHE_WARMER_JIKAN_BUDGET
+    refreshed = 0
+    for target in targets:
+        if not _needs_warming(entries.get(target.key)):
+            continue
+        if target.cost > budget:
+            logger.info(f"Cache warmer budget spent, {target.key} and later keys wait for the next cycle.")
+            break
+        budget -= target.cost
+        try:
+            await cache.refresh(target)
+            refreshed += 1
+        except Exception as e:
+            logger.warning(f"Cache warmer could not refresh {target.key}: {e!r}")
+    return refreshed
+
+
+async def run_cache_warmer() -> None:
+    """
+    Warms the cache every CACHE_WARMER_INTERVAL_SECONDS for the lifetime of the app.
+    Every worker runs this loop, but a Redis lock lets only one of them warm per cycle.
+    """
+    while True:
+        try:
+            if await redis.set(
+                WARMER_LOCK_KEY, "1", nx=True, ex=settings.CACHE_WARMER_INTERVAL_SECONDS
+            ):
+                refreshed = await warm_cache_once()
+                logger.info(f"Cache warmer refreshed {refreshed} keys.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache warmer cycle failed: {e!r}")
+        await asyncio.sleep(settings.CACHE_WARMER_INTERVAL_SECONDS)
@@ -1,38 +1,223 @@
 import asyncio
+import logging
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import httpx
+from app.core.config import settings
+from app.db.redis_conn import redis_client
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.ratelimiter import TokenBucketLimiter
 
-JIKAN_API_BASE_URL = "https://api.jikan.moe/v4"
+logger = logging.getLogger("default")
+
+JIKAN_API_BASE_URL = settings.JIKAN_API_BASE_URL
 POPULAR_MANGA_IDS_FOR_NEWS = [2, 1706, 1, 11, 16498]
+RECOMMENDATIONS_LIMIT = 12
+
+# Every worker draws from the same Redis token buckets, so together they stay
+# inside Jikan's per-second and per-minute quotas.
+jikan_rate_limiter = TokenBucketLimiter(
+    "jikan",
+    limits=[(settings.JIKAN_RATE_PER_SECOND, 1), (settings.JIKAN_RATE_PER_MINUTE, 60)],
+    redis=redis_client,
+    redis_retry_seconds=settings.JIKAN_RATE_LIMIT_REDIS_RETRY_SECONDS,
+)
+
+jikan_breaker = CircuitBreaker(
+    failure_threshold=settings.JIKAN_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.JIKAN_BREAKER_RESET_SECONDS,
+)
+
+
+class JikanError(Exception):
+    """Jikan answered with an error we cannot turn into data."""
+
+
+class JikanUnavailableError(JikanError):
+    """Jikan is down or throttling us, or the circuit breaker is open."""
+
+
+# One long-lived client per worker, opened and closed by the app lifespan.
+_client: httpx.AsyncClient | None = None
+_pool_stats = {
+    "requests_total": 0,
+    "in_flight": 0,
+    "peak_in_flight": 0,
+    "http2": False,
+    "responses_by_http_version": {},
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def _record_response(response: httpx.Response) -> None:
+    # Event hook: counts responses by the protocol actually negotiated.
+    by_version = _pool_stats["responses_by_http_version"]
+    by_version[response.http_version] = by_version.get(response.http_version, 0) + 1
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.JIKAN_HTTP2
+    if http2 and not _http2_available():
+        logger.warning("JIKAN_HTTP2 is set but 'h2' is not installed; using HTTP/1.1.")
+        http2 = False
+    _pool_stats["http2"] = http2
+
+    return httpx.AsyncClient(
+        base_url=JIKAN_API_BASE_URL,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.JIKAN_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.JIKAN_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.JIKAN_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.JIKAN_LIST_TIMEOUT,
+            connect=settings.JIKAN_CONNECT_TIMEOUT,
+            pool=settings.JIKAN_POOL_TIMEOUT,
+        ),
+        event_hooks={"response": [_record_response]},
+    )
+
+
+async def start_client() -> None:
+    """Opens the shared Jikan client. Called once from the app lifespan."""
+    get_client()
+
+
+async def close_client() -> None:
+    """Closes the shared Jikan client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the shared client, creating it lazily for scripts that run outside the app."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def get_pool_stats() -> dict:
+    """Request and response counters plus the configured pool limits."""
+    stats = dict(_pool_stats)
+    stats["responses_by_http_version"] = dict(_pool_stats["responses_by_http_version"])
+    stats["max_connections"] = settings.JIKAN_MAX_CONNECTIONS
+    stats["max_keepalive_connections"] = settings.JIKAN_MAX_KEEPALIVE_CONNECTIONS
+    return stats
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parses a Retry-After header given either in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), settings.JIKAN_RETRY_AFTER_MAX)
+
+
+def _backoff_seconds(attempt: int, retry_after: float | None) -> float:
+    # Full jitter, so retries from many requests do not line up.
+    delay = random.uniform(
+        0, min(settings.JIKAN_BACKOFF_MAX, settings.JIKAN_BACKOFF_BASE * 2**attempt)
+    )
+    return max(delay, retry_after or 0.0)
+
+
+async def _make_request(endpoint: str, params: dict = None, timeout: float | None = None) -> dict:
+    """
+    A reusable, rate-limited function to make requests to the Jikan API.
+
+    429s, 5xx responses, timeouts and connection errors are retried with
+    jittered exponential backoff, honouring Retry-After. A 404 returns an
+    empty dict. Anything else that fails raises JikanError, and the circuit
+    breaker makes calls fail fast while Jikan keeps failing.
+    """
+    if not jikan_breaker.allow_request():
+        raise JikanUnavailableError(f"Circuit open, not calling Jikan for {endpoint}")
+
+    client = get_client()
+    last_error: Exception | None = None
+    retry_after: float | None = None
+    for attempt in range(settings.JIKAN_MAX_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(_backoff_seconds(attempt - 1, retry_after))
+        retry_after = None
+
+        await jikan_rate_limiter.acquire()
+        _pool_stats["requests_total"] += 1
+        _pool_stats["in_flight"] += 1
+        _pool_stats["peak_in_flight"] = max(
+            _pool_stats["peak_in_flight"], _pool_stats["in_flight"]
+        )
+        try:
+            response = await client.get(
+                endpoint,
+                params=params,
+                # Only the read timeout varies per endpoint; connect/pool come from the client.
+                timeout=httpx.Timeout(
+                    timeout or settings.JIKAN_LIST_TIMEOUT,
+                    connect=settings.JIKAN_CONNECT_TIMEOUT,
+                    pool=settings.JIKAN_POOL_TIMEOUT,
+                ),
+            )
+        except httpx.TransportError as e:  # includes timeouts
+            last_error = e
+            logger.warning(f"Jikan request to {endpoint} failed (attempt {attempt + 1}): {e!r}")
+            continue
+        finally:
+            _pool_stats["in_flight"] -= 1
+
+        if response.status_code == 429 or response.status_code >= 500:
+            last_error = httpx.HTTPStatusError(
+                f"Jikan returned {response.status_code}", request=response.request, response=response
+            )
+            retry_after = _retry_after_seconds(response)
+            logger.warning(f"Jikan API Error: {last_error} (attempt {attempt + 1})")
+            continue
+
+        # Jikan answered, so it is healthy even if this particular call was rejected.
+        jikan_breaker.record_success()
+        if response.status_code == 404:
+            return {}
+        try:
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPStatusError, ValueError) as e:
+            raise JikanError(f"Jikan API Error for {endpoint}: {e}") from e
 
-# Create a semaphore to allow 3 concurrent requests to Jikan
-jikan_semaphore = asyncio.Semaphore(3)
-
-async def _make_request(endpoint: str, params: dict = None) -> dict:
-    """A reusable, rate-limited function to make requests to the Jikan API."""
-    async with jikan_semaphore: # This will wait if 3 tasks are already running
-        # Jikan also asks for a small delay between requests
-        await asyncio.sleep(0.4)
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{JIKAN_API_BASE_URL}/{endpoint}",
-                    params=params,
-                    timeout=20.0 # Add a timeout
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                print(f"Jikan API Error: {e}")
-                return {}
+    jikan_breaker.record_failure()
+    raise JikanUnavailableError(
+        f"Jikan request to {endpoint} failed after {settings.JIKAN_MAX_RETRIES + 1} attempts"
+    ) from last_error
 
 async def get_manga_details(mal_id: int) -> dict | None:
     """Fetches detailed information for a single manga."""
-    data = await _make_request(f"manga/{mal_id}")
+    data = await _make_request(f"manga/{mal_id}", timeout=settings.JIKAN_DETAILS_TIMEOUT)
     return data.get("data")
 
 async def search_manga(query: str, limit: int = 10) -> list:
     """Searches for manga by a query string."""
-    data = await _make_request("manga", params={"q": query, "limit": limit})
+    data = await _make_request(
+        "manga", params={"q": query, "limit": limit}, timeout=settings.JIKAN_SEARCH_TIMEOUT
+    )
     return data.get("data", [])
 
 async def get_top_manga(filter: str | None = None) -> list:
@@ -56,7 +241,7 @@ async def get_paginated_manga_list(page: int, limit: int, filters: dict) -> dict
 
 async def get_manga_news(mal_id: int) -> list:
     """Helper function to get news for a single manga ID."""
-    data = await _make_request(f"manga/{mal_id}/news")
+    data = await _make_request(f"manga/{mal_id}/news", timeout=settings.JIKAN_NEWS_TIMEOUT)
     return data.get("data", [])
 
 async def get_combined_news_for_popular() -> list:
@@ -70,7 +255,7 @@ async def get_combined_news_for_popular() -> list:
 async def get_recommendations() -> list:
     """Fetches manga recommendations concurrently AND safely."""
     data = await _make_request("recommendations/manga")
-    recommendation_entries = data.get("data", [])[:12]
+    recommendation_entries = data.get("data", [])[:RECOMMENDATIONS_LIMIT]
 
     tasks = []
     for entry in recommendation_entries:
@@ -1,19 +1,38 @@
 import asyncio
-import json
-from app.db.redis_conn import redis_client as aioredis
+import base64
+import binascii
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import AsyncIterator, Sequence
+from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
 
 from app.core.config import settings
 from app.crud import manga_crud
-from app.services import jikan_client
+from app.db.session import AsyncSessionLocal
+from app.services import cache, jikan_client
 from app.models.user_model import User
-from app.models.manga_model import MangaStatus
-from app.schemas.manga_schema import MangaRead, UserCollectionManga
-
-# Initialize the Redis client
-redis = aioredis.from_url(str(settings.REDIS_URL), decode_responses=True)
-CACHE_EXPIRATION_SECONDS = 60 * 60 * 24  # 24 hours
+from app.models.manga_model import MangaMetadata, MangaStatus
+from app.schemas.manga_schema import (
+    CollectionAction,
+    CollectionBulkResult,
+    CollectionOperation,
+    CollectionOperationResult,
+    CollectionSort,
+    MangaDetailsBatch,
+    MangaDetailsError,
+    MangaRead,
+    UserCollectionManga,
+)
+from app.utils.cache_keys import cache_key, canonical_params
+from app.utils.text import normalize_query, normalize_text
+
+logger = logging.getLogger("default")
+
+# Jikan's page size cap; search results are fetched once at this size and sliced.
+SEARCH_FETCH_LIMIT = 25
 
 # In app/services/manga_service.py
 
@@ -52,111 +71,393 @@ def _map_jikan_to_manga_read(jikan_data: dict) -> MangaRead | None:
 
 
 # --- Caching Jikan Data Services (All now use the mapper) ---
+# Every service goes through cache.get_or_load_entry, so concurrent misses for
+# the same key share a single Jikan call and stale entries refresh in the background.
+# TTLs per key family live in Settings (CACHE_*_SOFT_TTL / CACHE_*_HARD_TTL).
+# Values are validated through MangaRead once, when they are loaded; the list
+# services return the CacheEntry so endpoints can send its JSON bytes as is.
 
 
-async def get_manga_details_service(mal_id: int) -> MangaRead | None:
-    cache_key = f"manga_details:{mal_id}"
-    if cached_data := await redis.get(cache_key):
-        return MangaRead(**json.loads(cached_data))
-    if not (jikan_data := await jikan_client.get_manga_details(mal_id)):
+def _map_jikan_list(jikan_list: list) -> list[dict]:
+    return [_map_jikan_to_manga_read(item).model_dump() for item in jikan_list if item]
+
+
+# --- Postgres metadata mirror ---
+# Every detail fetched from Jikan is also written to the MangaMetadata table, so
+# details survive a cold Redis and can still be served while Jikan is down.
+
+
+def _metadata_to_dict(metadata: MangaMetadata) -> dict:
+    return metadata.model_dump(exclude={"fetched_at", "search_text"})
+
+
+def _is_fresh(metadata: MangaMetadata) -> bool:
+    age = datetime.now(timezone.utc) - metadata.fetched_at
+    return age < timedelta(seconds=settings.CATALOGUE_MAX_AGE_SECONDS)
+
+
+async def _read_catalogue(mal_ids: list[int]) -> dict[int, MangaMetadata]:
+    async with AsyncSessionLocal() as db:
+        return await manga_crud.get_manga_metadata(mal_ids, db=db)
+
+
+async def _save_to_catalogue(items: list[dict]) -> None:
+    """Best effort: a failed mirror write must not fail the request that fetched the data."""
+    if not items:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await manga_crud.upsert_manga_metadata(items, db=db)
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not update the manga metadata mirror: {e!r}")
+
+
+async def _fetch_manga_details(
+    mal_id: int, mirrored: MangaMetadata | None = None, save: bool = True
+) -> dict | None:
+    """Fetches details from Jikan, falling back to an old mirror row if Jikan fails."""
+    try:
+        jikan_data = await jikan_client.get_manga_details(mal_id)
+    except jikan_client.JikanError as e:
+        if mirrored is None:
+            raise
+        logger.warning(f"Serving mirrored details for {mal_id}: {e!r}")
+        return _metadata_to_dict(mirrored)
+
+    if not jikan_data:
         return None
-    mapped_manga = _map_jikan_to_manga_read(jikan_data)
-    await redis.set(
-        cache_key, mapped_manga.model_dump_json(), ex=CACHE_EXPIRATION_SECONDS
+    details = _map_jikan_to_manga_read(jikan_data).model_dump()
+    if save:
+        await _save_to_catalogue([details])
+    return details
+
+
+async def _load_manga_details(mal_id: int) -> dict | None:
+    mirrored = (await _read_catalogue([mal_id])).get(mal_id)
+    if mirrored and _is_fresh(mirrored):
+        return _metadata_to_dict(mirrored)
+    return await _fetch_manga_details(mal_id, mirrored)
+
+
+async def sync_catalogue_batch(
+    start_page: int, pages: int, stale_before: datetime | None = None
+) -> tuple[int, bool, int]:
+    """
+    Copies `pages` pages of Jikan's manga listing, ordered by mal_id, into the
+    metadata mirror with a single upsert. Rows fetched after `stale_before` are
+    left alone. Returns (next page, whether there are more pages, rows written).
+    """
+    items: list[dict] = []
+    page, has_more = start_page, True
+    while has_more and page < start_page + pages:
+        response = await jikan_client.get_paginated_manga_list(
+            page,
+            settings.CATALOGUE_SYNC_PAGE_SIZE,
+            {"order_by": "mal_id", "sort": "asc"},
+        )
+        items += _map_jikan_list(response.get("data", []))
+        has_more = bool((response.get("pagination") or {}).get("has_next_page"))
+        page += 1
+
+    async with AsyncSessionLocal() as db:
+        written = await manga_crud.upsert_manga_metadata(
+            items, db=db, only_if_fetched_before=stale_before
+        )
+    return page, has_more, written
+
+
+async def get_manga_details_entry(mal_id: int) -> cache.CacheEntry | None:
+    return await cache.get_or_load_target(manga_details_cache_target(mal_id))
+
+
+async def get_manga_details_service(mal_id: int) -> MangaRead | None:
+    entry = await get_manga_details_entry(mal_id)
+    return MangaRead(**entry.data) if entry else None
+
+
+async def _resolve_many_manga_details(
+    mal_ids: list[int],
+) -> tuple[dict[int, MangaRead], dict[int, str]]:
+    """
+    Resolves details for many manga with one cache MGET.
+    Misses are looked up in the metadata mirror with one query, and only what
+    is still missing or outdated goes to Jikan, with bounded concurrency.
+    Everything loaded is written back in one pipelined round trip.
+    Returns the details found plus an error per id that could not be resolved:
+    "not_found" (also cached as a negative entry) or "unavailable".
+    """
+    keys = {mal_id: cache_key("manga_details", mal_id) for mal_id in dict.fromkeys(mal_ids)}
+    cached = await cache.get_many(list(keys.values()))
+
+    details_map: dict[int, MangaRead] = {}
+    errors: dict[int, str] = {}
+    misses = []
+    # Past their hard TTL: reloaded like misses, and only served if that load fails.
+    expired: dict[int, cache.CacheEntry] = {}
+    for mal_id, key in keys.items():
+        entry = cached.get(key)
+        if entry is None or entry.is_expired:
+            misses.append(mal_id)
+            if entry is not None and not entry.is_negative:
+                expired[mal_id] = entry
+            continue
+        if entry.is_negative:
+            errors[mal_id] = "not_found"
+            continue
+        if entry.is_stale:
+            cache.schedule_refresh(key, partial(_load_manga_details, mal_id))
+        if entry.data:
+            details_map[mal_id] = MangaRead(**entry.data)
+
+    fetched: dict[int, dict | None] = {}
+    mirrored = await _read_catalogue(misses) if misses else {}
+    for mal_id, metadata in mirrored.items():
+        if _is_fresh(metadata):
+            fetched[mal_id] = _metadata_to_dict(metadata)
+    misses = [mal_id for mal_id in misses if mal_id not in fetched]
+
+    not_found: list[int] = []
+    if misses:
+        semaphore = asyncio.Semaphore(settings.CACHE_BATCH_FETCH_CONCURRENCY)
+
+        async def _fetch(mal_id: int) -> tuple[int, dict | None]:
+            async with semaphore:
+                try:
+                    # Shares the in-flight load with any concurrent single-id request.
+                    entry = await cache.load_entry(
+                        keys[mal_id], partial(_fetch_manga_details, mal_id, save=False)
+                    )
+                except jikan_client.JikanError as e:
+                    # One failed title should not fail the whole batch.
+                    logger.warning(f"Could not load details for {mal_id}: {e!r}")
+                    return mal_id, None
+                if entry is None:
+                    not_found.append(mal_id)
+                return mal_id, entry.data if entry else None
+
+        from_jikan = dict(await asyncio.gather(*(_fetch(mal_id) for mal_id in misses)))
+        await _save_to_catalogue([data for data in from_jikan.values() if data])
+        fetched.update(from_jikan)
+        # Jikan failed for these: an expired entry or outdated mirror row is better than nothing.
+        for mal_id, data in from_jikan.items():
+            if data is not None:
+                continue
+            if mal_id in not_found:
+                errors[mal_id] = "not_found"
+            elif mal_id in expired:
+                details_map[mal_id] = MangaRead(**expired[mal_id].data)
+            elif mal_id in mirrored:
+                details_map[mal_id] = MangaRead(**_metadata_to_dict(mirrored[mal_id]))
+            else:
+                errors[mal_id] = "unavailable"
+
+    new_entries = {
+        keys[mal_id]: cache.make_entry(keys[mal_id], data)
+        for mal_id, data in fetched.items()
+        if data
+    }
+    # Only a 404 is remembered; a failed fetch is retried on the next request.
+    new_entries.update({keys[mal_id]: cache.make_negative_entry() for mal_id in not_found})
+    await cache.set_many(new_entries)
+    details_map.update(
+        {mal_id: MangaRead(**data) for mal_id, data in fetched.items() if data}
     )
-    return mapped_manga
 
+    return details_map, errors
 
-async def get_top_manga_service(filter: str | None = None) -> list[MangaRead]:
-    cache_key = f"top_manga:{filter or 'popular'}"
-    if cached_data := await redis.get(cache_key):
-        return json.loads(cached_data)
 
-    jikan_list = await jikan_client.get_top_manga(filter=filter)
-    mapped_list = [_map_jikan_to_manga_read(item) for item in jikan_list if item]
+async def get_many_manga_details_service(mal_ids: list[int]) -> dict[int, MangaRead]:
+    """Details for many manga, keyed by mal_id. Ids that cannot be resolved are left out."""
+    details_map, _ = await _resolve_many_manga_details(mal_ids)
+    return details_map
 
-    # Cache for 2 hours instead of default
-    await redis.set(
-        cache_key, json.dumps([m.model_dump() for m in mapped_list]), ex=7200
+
+async def get_manga_details_batch_service(mal_ids: list[int]) -> MangaDetailsBatch:
+    """
+    Details for many manga in request order. One failed id is reported in
+    `errors` instead of failing the whole batch.
+    """
+    mal_ids = list(dict.fromkeys(mal_ids))
+    details_map, errors = await _resolve_many_manga_details(mal_ids)
+    return MangaDetailsBatch(
+        results=[details_map[mal_id] for mal_id in mal_ids if mal_id in details_map],
+        errors=[
+            MangaDetailsError(mal_id=mal_id, error=errors.get(mal_id, "unavailable"))
+            for mal_id in mal_ids
+            if mal_id not in details_map
+        ],
     )
-    return [m.model_dump() for m in mapped_list]
 
 
-async def search_manga_service(query: str) -> list[dict]:
-    cache_key = f"search:{query.lower().replace(' ', '_')}"
-    if cached_data := await redis.get(cache_key):
-        return json.loads(cached_data)
-    jikan_list = await jikan_client.search_manga(query)
-    mapped_list = [_map_jikan_to_manga_read(item) for item in jikan_list if item]
-    await redis.set(
-        cache_key, json.dumps([m.model_dump() for m in mapped_list]), ex=3600
+async def _search_catalogue(query: str, limit: int, offset: int) -> list[dict]:
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = await manga_crud.search_manga_metadata(
+                query,
+                limit=limit,
+                offset=offset,
+                similarity_threshold=settings.SEARCH_SIMILARITY_THRESHOLD,
+                db=db,
+            )
+    except SQLAlchemyError as e:
+        logger.warning(f"Local search failed, falling back to Jikan: {e!r}")
+        return []
+    return [_metadata_to_dict(row) for row in rows]
+
+
+async def search_manga_service(query: str, limit: int = 10, offset: int = 0) -> list[dict]:
+    """
+    Searches the local catalogue mirror first. A query whose first local page
+    is not full goes to Jikan, and its local hits are merged with Jikan's
+    results into one cached list; the Jikan results are mirrored, so later
+    searches for them are answered locally.
+
+    Every page of a query comes from the same source: the cached merged list
+    while it exists, otherwise the mirror when its first page is full.
+    """
+    local_query = normalize_text(query)
+    # Punctuation and spacing variants of a query share one Jikan call and cache key.
+    jikan_query = normalize_query(query)
+    if not jikan_query:
+        # Only punctuation or spaces: nothing to search for.
+        return []
+    key = cache_key("search", jikan_query)
+
+    first_page: list[dict] = []
+    cached = await cache.peek(key)
+    if cached is None or cached.is_expired:
+        first_page = await _search_catalogue(local_query, limit, 0)
+        if len(first_page) >= limit:
+            if offset == 0:
+                return first_page
+            return await _search_catalogue(local_query, limit, offset)
+
+    async def _load() -> list[dict] | None:
+        # Read the local hits before the Jikan results are mirrored, so they come first.
+        local = await _search_catalogue(local_query, SEARCH_FETCH_LIMIT, 0)
+        # Fetch a full page once and slice it, so limit/offset do not fragment the cache.
+        remote = _map_jikan_list(
+            await jikan_client.search_manga(jikan_query, limit=SEARCH_FETCH_LIMIT)
+        )
+        await _save_to_catalogue(remote)
+        seen = {manga["mal_id"] for manga in local}
+        results = local + [manga for manga in remote if manga["mal_id"] not in seen]
+        # No results is cached as a negative entry, with its own short TTL.
+        return results or None
+
+    try:
+        results = await cache.get_or_load(key, _load) or []
+    except jikan_client.JikanError as e:
+        if not first_page:
+            raise
+        # Jikan is down but the mirror has something; a short answer beats an error.
+        logger.warning(f"Search for {jikan_query!r} served from the mirror only: {e!r}")
+        return first_page if offset == 0 else await _search_catalogue(local_query, limit, offset)
+    return results[offset : offset + limit]
+
+
+# --- Cache targets ---
+# Each target is a cache key plus the loader that fills it. The services below
+# read through them, and the cache warmer refreshes them ahead of expiry.
+
+
+def top_manga_cache_target(filter: str | None = None) -> cache.CacheTarget:
+    async def _load() -> list[dict]:
+        return _map_jikan_list(await jikan_client.get_top_manga(filter=filter))
+
+    return cache.CacheTarget(cache_key("top_manga", filter or "popular"), _load)
+
+
+def recommendations_cache_target() -> cache.CacheTarget:
+    async def _load() -> list[dict]:
+        return _map_jikan_list(await jikan_client.get_recommendations())
+
+    # One call for the list, then one details call per recommendation.
+    return cache.CacheTarget(
+        cache_key("manga_recommendations"),
+        _load,
+        cost=1 + jikan_client.RECOMMENDATIONS_LIMIT,
     )
-    return [m.model_dump() for m in mapped_list]
-
-
-async def get_recommendations_service() -> list[dict]:
-    cache_key = "manga_recommendations"
-    if cached_data := await redis.get(cache_key):
-        return json.loads(cached_data)
-    jikan_list = await jikan_client.get_recommendations()
-    mapped_list = [_map_jikan_to_manga_read(item) for item in jikan_list if item]
-    await redis.set(
-        cache_key,
-        json.dumps([m.model_dump() for m in mapped_list]),
-        ex=CACHE_EXPIRATION_SECONDS,
+
+
+def genre_cache_target(genre_id: int) -> cache.CacheTarget:
+    async def _load() -> list[dict]:
+        return _map_jikan_list(await jikan_client.get_manga_by_genre(genre_id))
+
+    return cache.CacheTarget(cache_key("genre", genre_id), _load)
+
+
+def news_cache_target() -> cache.CacheTarget:
+    # This target is fine as it doesn't use the MangaRead mapper
+    return cache.CacheTarget(
+        cache_key("combined_news"),
+        jikan_client.get_combined_news_for_popular,
+        cost=len(jikan_client.POPULAR_MANGA_IDS_FOR_NEWS),
     )
-    return [m.model_dump() for m in mapped_list]
-
-
-async def get_manga_by_genre_service(genre_id: int) -> list[dict]:
-    cache_key = f"genre:{genre_id}"
-    if cached_data := await redis.get(cache_key):
-        return json.loads(cached_data)
-    jikan_list = await jikan_client.get_manga_by_genre(genre_id)
-    mapped_list = [_map_jikan_to_manga_read(item) for item in jikan_list if item]
-    await redis.set(
-        cache_key,
-        json.dumps([m.model_dump() for m in mapped_list]),
-        ex=CACHE_EXPIRATION_SECONDS,
+
+
+def manga_list_cache_target(page: int, limit: int, filters: dict) -> cache.CacheTarget:
+    # Equivalent filters (order, spacing, "1,4" vs "4, 1") share one key and one Jikan call.
+    filters = canonical_params(filters)
+
+    async def _load() -> dict:
+        jikan_response = await jikan_client.get_paginated_manga_list(
+            page, limit, filters
+        )
+        # Reconstruct the response with the mapped data
+        return {
+            "mangas": _map_jikan_list(jikan_response.get("data", [])),
+            "pagination": jikan_response.get("pagination"),
+        }
+
+    # An empty page is never cached, it may just be Jikan having a bad moment.
+    return cache.CacheTarget(
+        cache_key("manga_list", page=page, limit=limit, **filters),
+        _load,
+        is_empty=lambda response: not response["mangas"],
     )
-    return [m.model_dump() for m in mapped_list]
 
 
-async def get_combined_news_service() -> list:
-    # This service is fine as it doesn't use the MangaRead mapper
-    cache_key = "combined_news"
-    if cached_data := await redis.get(cache_key):
-        return json.loads(cached_data)
-    news_list = await jikan_client.get_combined_news_for_popular()
-    await redis.set(cache_key, json.dumps(news_list), ex=3600 * 6)
-    return news_list
+def manga_details_cache_target(mal_id: int) -> cache.CacheTarget:
+    return cache.CacheTarget(
+        cache_key("manga_details", mal_id), partial(_load_manga_details, mal_id)
+    )
 
 
-async def get_paginated_manga_service(page: int, limit: int, filters: dict) -> dict:
-    """Service to get a paginated list of manga, with caching."""
-    # Create a unique key based on all parameters
-    filter_str = "_".join(f"{k}_{v}" for k, v in sorted(filters.items()))
-    cache_key = f"manga_list:p{page}:l{limit}:{filter_str}"
+async def invalidate_manga_details(mal_id: int) -> tuple[bool, int]:
+    """
+    Drops one title from the cache, along with every cached list that
+    contains it, and marks its mirror row stale, so the next read goes back
+    to Jikan. Returns whether a details entry existed and how many lists
+    were dropped.
+    """
+    async with AsyncSessionLocal() as db:
+        await manga_crud.expire_manga_metadata([mal_id], db=db)
+    existed = await cache.invalidate_key(manga_details_cache_target(mal_id).key)
+    return existed, await cache.invalidate_tagged(mal_id)
 
-    if cached_data := await redis.get(cache_key):
-        return json.loads(cached_data)
 
-    jikan_response = await jikan_client.get_paginated_manga_list(page, limit, filters)
+async def get_top_manga_service(filter: str | None = None) -> cache.CacheEntry:
+    return await cache.get_or_load_target(top_manga_cache_target(filter))
 
-    # Map the manga list within the response
-    raw_manga_list = jikan_response.get("data", [])
-    mapped_manga_list = [
-        _map_jikan_to_manga_read(item) for item in raw_manga_list if item
-    ]
 
-    # Reconstruct the response with the mapped data
-    final_response = {
-        "mangas": [m.model_dump() for m in mapped_manga_list],
-        "pagination": jikan_response.get("pagination"),
-    }
+async def get_recommendations_service() -> cache.CacheEntry:
+    return await cache.get_or_load_target(recommendations_cache_target())
+
+
+async def get_manga_by_genre_service(genre_id: int) -> cache.CacheEntry:
+    return await cache.get_or_load_target(genre_cache_target(genre_id))
 
-    await redis.set(cache_key, json.dumps(final_response), ex=3600)  # Cache for 1 hour
-    return final_response
+
+async def get_combined_news_service() -> cache.CacheEntry:
+    return await cache.get_or_load_target(news_cache_target())
+
+
+async def get_paginated_manga_service(
+    page: int, limit: int, filters: dict
+) -> cache.CacheEntry:
+    """Service to get a paginated list of manga, with caching."""
+    return await cache.get_or_load_target(manga_list_cache_target(page, limit, filters))
 
 
 # --- User Collection Services ---
@@ -165,93 +466,272 @@ async def get_paginated_manga_service(page: int, limit: int, filters: dict) -> d
 async def add_manga_to_collection_service(
     mal_id: int, current_user: User, db: AsyncSession
 ):
-    manga = await manga_crud.get_or_create_manga(mal_id=mal_id, db=db)
-    if await manga_crud.get_user_manga_link(
-        user_id=current_user.id, manga_id=manga.id, db=db
-    ):
+    # Details are mirrored whenever they are loaded, so adding needs neither Jikan nor the mirror.
+    link = await manga_crud.add_manga_to_user_collection(
+        user_id=current_user.id, mal_id=mal_id, db=db
+    )
+    if link is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Manga already in collection."
         )
-    await manga_crud.add_manga_to_user_collection(
-        user_id=current_user.id, manga_id=manga.id, db=db
-    )
     return {"message": "Manga successfully added to your collection."}
 
 
 async def update_manga_status_service(
     mal_id: int, new_status: MangaStatus, current_user: User, db: AsyncSession
 ):
-    manga = await manga_crud.get_or_create_manga(mal_id=mal_id, db=db)
-    link = await manga_crud.get_user_manga_link(
-        user_id=current_user.id, manga_id=manga.id, db=db
+    link = await manga_crud.update_user_manga_status(
+        user_id=current_user.id, mal_id=mal_id, status=new_status, db=db
     )
-    if not link:
+    if link is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Manga not in collection."
         )
-    return await manga_crud.update_user_manga_status(
-        link=link, status=new_status, db=db
-    )
+    return link
 
 
 async def remove_manga_from_collection_service(
     mal_id: int, current_user: User, db: AsyncSession
 ):
-    manga = await manga_crud.get_or_create_manga(mal_id=mal_id, db=db)
-    link = await manga_crud.get_user_manga_link(
-        user_id=current_user.id, manga_id=manga.id, db=db
-    )
-    if not link:
+    if not await manga_crud.remove_manga_from_user_collection(
+        user_id=current_user.id, mal_id=mal_id, db=db
+    ):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Manga not in collection."
         )
-    await manga_crud.remove_manga_from_user_collection(link=link, db=db)
     return {"message": "Manga successfully removed from your collection."}
 
 
+async def bulk_update_collection_service(
+    operations: list[CollectionOperation], current_user: User, db: AsyncSession
+) -> CollectionBulkResult:
+    """
+    Applies many adds, status updates and removes in one transaction and
+    reports an outcome per operation, in request order. A mal_id may appear
+    only once per request; later operations on it are skipped as duplicates.
+    """
+    adds: dict[int, MangaStatus] = {}
+    updates: dict[int, MangaStatus] = {}
+    removes: list[int] = []
+    outcomes: list[str | None] = []
+    seen: set[int] = set()
+    for operation in operations:
+        if operation.mal_id in seen:
+            outcomes.append("duplicate")
+            continue
+        seen.add(operation.mal_id)
+        if operation.action == CollectionAction.ADD:
+            adds[operation.mal_id] = operation.status or MangaStatus.PLANNED
+        elif operation.action == CollectionAction.UPDATE and operation.status is None:
+            outcomes.append("invalid")
+            continue
+        elif operation.action == CollectionAction.UPDATE:
+            updates[operation.mal_id] = operation.status
+        else:
+            removes.append(operation.mal_id)
+        outcomes.append(None)
+
+    added, updated, removed = await manga_crud.apply_user_collection_changes(
+        user_id=current_user.id, adds=adds, updates=updates, removes=removes, db=db
+    )
+
+    results = []
+    for operation, outcome in zip(operations, outcomes):
+        new_status = None
+        if outcome is None and operation.action == CollectionAction.ADD:
+            applied = operation.mal_id in added
+            outcome = "added" if applied else "already_in_collection"
+            new_status = adds[operation.mal_id] if applied else None
+        elif outcome is None and operation.action == CollectionAction.UPDATE:
+            applied = operation.mal_id in updated
+            outcome = "updated" if applied else "not_in_collection"
+            new_status = operation.status if applied else None
+        elif outcome is None:
+            outcome = "removed" if operation.mal_id in removed else "not_in_collection"
+        results.append(
+            CollectionOperationResult(
+                action=operation.action,
+                mal_id=operation.mal_id,
+                outcome=outcome,
+                status=new_status,
+            )
+        )
+    return CollectionBulkResult(results=results)
+
+
+def _to_collection_manga(details: MangaRead, status: MangaStatus) -> UserCollectionManga:
+    return UserCollectionManga(
+        mal_id=details.mal_id,
+        title=details.title,
+        status=status,  # Use the status from OUR database
+        cover_url=details.cover_url,
+        author=details.author,
+        year=details.year,
+        rating=details.rating,
+        tags=details.tags,
+    )
+
+
+def _encode_collection_cursor(added_at: datetime, manga_id: int) -> str:
+    position = f"{added_at.isoformat()}|{manga_id}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def _decode_collection_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        position = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        added_at, manga_id = position.split("|")
+        return datetime.fromisoformat(added_at), int(manga_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
+
+
 async def get_user_collection_service(
-    current_user: User, db: AsyncSession
-) -> list[UserCollectionManga]:
+    current_user: User,
+    db: AsyncSession,
+    status_filter: MangaStatus | None = None,
+    sort: CollectionSort = CollectionSort.NEWEST,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> tuple[list[UserCollectionManga], str | None]:
     """
     Gets a user's collection, enriches it with Jikan data, and returns it.
+    With `limit`, returns one page plus the cursor of the next page (None on
+    the last page); pages are keyset-paginated on (added_at, manga_id).
     """
-    # 1. Get the user's saved manga list from our database.
-    # This is fast and efficient because it uses a single query.
-    collection_links = await manga_crud.get_user_collection_links(
-        user_id=current_user.id, db=db
+    # 1. Get the user's saved manga list joined with the metadata mirror.
+    # This is a single query and needs neither Redis nor Jikan for mirrored titles.
+    rows = await manga_crud.get_user_collection_with_metadata(
+        user_id=current_user.id,
+        db=db,
+        status=status_filter,
+        newest_first=sort == CollectionSort.NEWEST,
+        after=_decode_collection_cursor(cursor) if cursor else None,
+        # One extra row tells us whether there is a next page.
+        limit=limit + 1 if limit is not None else None,
     )
-    if not collection_links:
-        return []
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last_link = rows[-1][0]
+        next_cursor = _encode_collection_cursor(last_link.added_at, last_link.manga_id)
+    if not rows:
+        return [], None
+
+    details_map: dict[int, MangaRead] = {}
+    not_mirrored = []
+    refreshes_left = settings.CATALOGUE_REFRESHES_PER_REQUEST
+    for _, mal_id, metadata in rows:
+        if metadata is None:
+            not_mirrored.append(mal_id)
+            continue
+        details_map[mal_id] = MangaRead(**_metadata_to_dict(metadata))
+        # Outdated rows are served as is and refreshed in the background, a few per view.
+        if not _is_fresh(metadata) and refreshes_left > 0:
+            refreshes_left -= 1
+            cache.schedule_refresh(
+                cache_key("manga_details", mal_id), partial(_load_manga_details, mal_id)
+            )
 
-    # 2. Create a list of tasks to fetch full details for each manga concurrently.
-    tasks = [
-        get_manga_details_service(link.manga.mal_id)
-        for link in collection_links
-        if link.manga
+    # 2. Titles that were never mirrored go through the batch path: a single
+    # cache MGET, with Jikan only called for the misses.
+    if not_mirrored:
+        details_map.update(await get_many_manga_details_service(not_mirrored))
+
+    # 3. Build the final, combined list.
+    collection = [
+        _to_collection_manga(details_map[mal_id], link.status)
+        for link, mal_id, _ in rows
+        if mal_id in details_map
     ]
-    all_manga_details = await asyncio.gather(*tasks)
-
-    # 3. Create a dictionary of the fetched details for fast lookups.
-    details_map = {m.mal_id: m for m in all_manga_details if m}
-
-    # 4. Build the final, combined list.
-    final_collection = []
-    for link in collection_links:
-        # Find the matching details from our map.
-        if link.manga and link.manga.mal_id in details_map:
-            details = details_map[link.manga.mal_id]
-
-            # Create the final object using the correct schema.
-            user_manga = UserCollectionManga(
-                mal_id=details.mal_id,
-                title=details.title,
-                status=link.status,  # Use the status from OUR database
-                cover_url=details.cover_url,
-                author=details.author,
-                year=details.year,
-                rating=details.rating,
-                tags=details.tags,
-            )
-            final_collection.append(user_manga)
+    return collection, next_cursor
+
 
-    return final_collection
+async def _enrich_collection_chunk(
+    rows: Sequence[tuple[MangaStatus, int, MangaMetadata | None]],
+) -> AsyncIterator[UserCollectionManga]:
+    """
+    Yields each row of a collection chunk as soon as its details are known:
+    mirrored titles right away, cached ones after one MGET, and the rest as
+    their Jikan fetches complete, with bounded concurrency.
+    """
+    statuses: dict[int, MangaStatus] = {}
+    refreshes_left = settings.CATALOGUE_REFRESHES_PER_REQUEST
+    for link_status, mal_id, metadata in rows:
+        if metadata is None:
+            statuses[mal_id] = link_status
+            continue
+        yield _to_collection_manga(MangaRead(**_metadata_to_dict(metadata)), link_status)
+        if not _is_fresh(metadata) and refreshes_left > 0:
+            refreshes_left -= 1
+            cache.schedule_refresh(
+                cache_key("manga_details", mal_id), partial(_load_manga_details, mal_id)
+            )
+    if not statuses:
+        return
+
+    keys = {mal_id: cache_key("manga_details", mal_id) for mal_id in statuses}
+    cached = await cache.get_many(list(keys.values()))
+    misses = []
+    for mal_id, key in keys.items():
+        entry = cached.get(key)
+        if entry is None or entry.is_expired:
+            misses.append(mal_id)
+        elif not entry.is_negative:
+            if entry.is_stale:
+                cache.schedule_refresh(key, partial(_load_manga_details, mal_id))
+            yield _to_collection_manga(MangaRead(**entry.data), statuses[mal_id])
+    if not misses:
+        return
+
+    semaphore = asyncio.Semaphore(settings.CACHE_BATCH_FETCH_CONCURRENCY)
+
+    async def _fetch(mal_id: int) -> UserCollectionManga | None:
+        async with semaphore:
+            try:
+                details = await get_manga_details_service(mal_id)
+            except jikan_client.JikanError as e:
+                # One failed title should not end the whole stream.
+                logger.warning(f"Could not load details for {mal_id}: {e!r}")
+                return None
+        return _to_collection_manga(details, statuses[mal_id]) if details else None
+
+    tasks = [asyncio.ensure_future(_fetch(mal_id)) for mal_id in misses]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            if item := await next_done:
+                yield item
+    finally:
+        # The client may have gone away mid-chunk.
+        for task in tasks:
+            task.cancel()
+
+
+async def stream_user_collection_service(user_id: int) -> AsyncIterator[UserCollectionManga]:
+    """
+    Streams a user's collection one keyset page at a time, oldest first, so
+    memory use does not grow with the size of the collection. Items come out
+    in the order their details resolve.
+    Each page is read in its own short session, closed before any Jikan
+    fetch, so a slow stream never holds a pooled connection or an open
+    transaction. The response outlives the request's dependencies anyway.
+    """
+    chunk_size = settings.COLLECTION_STREAM_CHUNK_SIZE
+    after = None
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = await manga_crud.get_user_collection_with_metadata(
+                user_id, db=db, newest_first=False, after=after, limit=chunk_size
+            )
+        if not rows:
+            return
+        last_link = rows[-1][0]
+        after = (last_link.added_at, last_link.manga_id)
+
+        chunk = [(link.status, mal_id, metadata) for link, mal_id, metadata in rows]
+        async for item in _enrich_collection_chunk(chunk):
+            yield item
+        if len(rows) < chunk_size:
+            return
@@ -0,0 +1,87 @@
+import logging
+from datetime import datetime
+
+import orjson
+
+from app.core.config import settings
+from app.db.redis_conn import redis_client as redis
+from app.models.user_model import User
+from app.utils.lru_cache import TTLCache
+
+logger = logging.getLogger("default")
+
+# Short-lived copies of authenticated users, so protected requests do not
+# need a database round trip to rebuild the User row. Copies never carry the
+# password hash and are shared between requests: treat them as read-only.
+
+_local = TTLCache(maxsize=settings.USER_CACHE_MAX_ENTRIES, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+def _key(sub: str) -> str:
+    return f"user:{sub}"
+
+
+def _identity(user: User) -> User:
+    return User(id=user.id, name=user.name, email=user.email, created_at=user.created_at)
+
+
+async def get_user(sub: str) -> User | None:
+    """The cached user for a token subject, or None if it has to be looked up."""
+    if not settings.USER_CACHE_ENABLED:
+        return None
+    if (user := _local.get(sub)) is not None:
+        return user
+    if not settings.USER_CACHE_REDIS:
+        return None
+
+    try:
+        raw = await redis.get(_key(sub))
+    except Exception as e:
+        logger.warning(f"Could not read the user cache: {e!r}")
+        return None
+    if raw is None:
+        return None
+    fields = orjson.loads(raw)
+    fields["created_at"] = datetime.fromisoformat(fields["created_at"])
+    user = User(**fields)
+    _local.set(sub, user)
+    return user
+
+
+async def set_user(sub: str, user: User) -> None:
+    if not settings.USER_CACHE_ENABLED:
+        return
+    identity = _identity(user)
+    _local.set(sub, identity)
+    if not settings.USER_CACHE_REDIS:
+        return
+
+    fields = identity.model_dump(include={"id", "name", "email", "created_at"})
+    try:
+        await redis.set(
+            _key(sub), orjson.dumps(fields), ex=int(settings.USER_CACHE_TTL_SECONDS)
+        )
+    except Exception as e:
+        logger.warning(f"Could not write the user cache: {e!r}")
+
+
+async def invalidate_user(user: User) -> None:
+    """Drops a user under every subject it can be looked up by. Call after changing a user."""
+    subjects = [str(user.id), user.email]
+    for sub in subjects:
+        _local.delete(sub)
+    if not settings.USER_CACHE_REDIS:
+        return
+    try:
+        await redis.delete(*(_key(sub) for sub in subjects))
+    except Exception as e:
+        # The copies still expire on their own after USER_CACHE_TTL_SECONDS.
+        logger.warning(f"Could not invalidate the user cache: {e!r}")
+
+
+def get_stats() -> dict:
+    return {
+        "enabled": settings.USER_CACHE_ENABLED,
+        "redis": settings.USER_CACHE_REDIS,
+        "local": _local.stats(),
+    }
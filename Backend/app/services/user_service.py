@@ -4,6 +4,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from app.crud import user_crud
 from app.core import security
 from app.schemas.user_schema import UserCreate
+from app.services import user_cache
 
 
 async def register_new_user(user_in: UserCreate, db: AsyncSession):
@@ -14,7 +15,7 @@ async def register_new_user(user_in: UserCreate, db: AsyncSession):
             detail="User with this email already exists.",
         )
 
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = await security.hash_password(user_in.password)
     user_in.password = hashed_password
     
     new_user = await user_crud.create_user(db=db, user_in=user_in)
@@ -25,14 +26,25 @@ async def authenticate_user(form_data: OAuth2PasswordRequestForm, db: AsyncSessi
     """Business logic to authenticate a user and create a token."""
     user = await user_crud.get_user_by_email(email=form_data.username, db=db)
 
-    if not user or not security.verify_password(form_data.password, user.password):
+    valid, new_hash = (
+        await security.verify_and_update_password(form_data.password, user.password)
+        if user
+        else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    access_token = security.create_access_token(data={"sub": user.email})
+
+    # The stored hash predates the current cost settings: upgrade it while we have the password.
+    if new_hash:
+        await user_crud.update_user_password(user=user, hashed_password=new_hash, db=db)
+        await user_cache.invalidate_user(user)
+
+    # `sub` is the user id, so requests can look the user up by primary key.
+    access_token = security.create_access_token(data={"sub": str(user.id)})
     
     # Return the full token object to match the schema
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
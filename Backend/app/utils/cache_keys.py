@@ -0,0 +1,69 @@
+import hashlib
+import re
+from urllib.parse import quote
+
+from app.utils.text import normalize_text
+
+_INTEGER = re.compile(r"-?[0-9]+")
+
+# Keys longer than this have everything after the family replaced by a hash.
+MAX_KEY_LENGTH = 200
+
+
+def canonical_value(value, parse_numbers: bool = True) -> str | None:
+    """
+    One spelling per meaning: numbers without leading zeros or trailing ".0",
+    lower-case booleans, normalized text, and lists sorted and deduplicated.
+    None means "not set". With `parse_numbers` false, text that looks like a
+    number is kept as typed, for free text where "007" and "7" differ.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+    if isinstance(value, (list, tuple, set)):
+        items = {canonical_value(item, parse_numbers) for item in value}
+        return ",".join(sorted(item for item in items if item))
+
+    text = normalize_text(str(value))
+    return str(int(text)) if parse_numbers and _INTEGER.fullmatch(text) else text
+
+
+def canonical_params(params: dict) -> dict[str, str]:
+    """
+    Canonical values for a set of query parameters, sorted by name, with unset
+    ones dropped. Comma-separated values (e.g. genres=4,1) are treated as lists.
+    """
+    canonical = {
+        name: canonical_value(value.split(",") if isinstance(value, str) else value)
+        for name, value in params.items()
+    }
+    return {name: canonical[name] for name in sorted(canonical) if canonical[name]}
+
+
+def cache_key(family: str, *parts, **params) -> str:
+    """
+    Builds "family:part:part:name=value&name=value" from canonical values.
+    Parts and values are percent-encoded, so they can never run into each
+    other or into the separators. Parts may be free text, so only params
+    given as text are read as numbers.
+    """
+    segments = [quote(canonical_value(part, parse_numbers=False) or "", safe="") for part in parts]
+    if params:
+        segments.append(
+            "&".join(
+                f"{name}={quote(value, safe='')}"
+                for name, value in canonical_params(params).items()
+            )
+        )
+    if not segments:
+        return family
+
+    rest = ":".join(segments)
+    if len(family) + 1 + len(rest) > MAX_KEY_LENGTH:
+        # '#' is always percent-encoded in a part, so a hashed key cannot collide with a plain one.
+        rest = "#" + hashlib.blake2b(rest.encode(), digest_size=16).hexdigest()
+    return f"{family}:{rest}"
+
@@ -0,0 +1,67 @@
+import time
+
+
+class CircuitBreaker:
+    """
+    A consecutive-failure circuit breaker.
+
+    After `failure_threshold` failures in a row the circuit opens and calls
+    fail fast for `reset_timeout` seconds. Then a single trial call is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_started_at: float | None = None
+
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_started_at = None
+
+        if self.state == self.HALF_OPEN:
+            now = time.monotonic()
+            # A trial that never reported back (e.g. it was cancelled) expires after one timeout.
+            if (
+                self._trial_started_at is not None
+                and now - self._trial_started_at < self.reset_timeout
+            ):
+                self.rejected += 1
+                return False
+            self._trial_started_at = now
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_started_at = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
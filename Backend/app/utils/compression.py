@@ -0,0 +1,53 @@
+import logging
+import zlib
+from typing import Callable, NamedTuple
+
+try:
+    import zstandard
+except ImportError:  # optional: zlib is used instead
+    zstandard = None
+
+logger = logging.getLogger("default")
+
+
+class Compressor(NamedTuple):
+    """A compression scheme, identified in stored data by a one-byte id."""
+
+    id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+
+NONE = Compressor(0, "none", _identity, _identity)
+
+
+def _zlib(level: int) -> Compressor:
+    return Compressor(1, "zlib", lambda data: zlib.compress(data, level), zlib.decompress)
+
+
+def _zstd(level: int) -> Compressor:
+    compressor = zstandard.ZstdCompressor(level=level)
+    decompressor = zstandard.ZstdDecompressor()
+    return Compressor(2, "zstd", compressor.compress, decompressor.decompress)
+
+
+def get_compressors(name: str, level: int) -> tuple[Compressor, dict[int, Compressor]]:
+    """
+    Returns the compressor to write with plus every compressor this process can
+    read, keyed by id. Asking for zstd without the zstandard package falls back to zlib.
+    """
+    readable = {NONE.id: NONE}
+    zlib_compressor = readable[1] = _zlib(level)
+    if zstandard is not None:
+        readable[2] = _zstd(level)
+
+    by_name = {compressor.name: compressor for compressor in readable.values()}
+    if name not in by_name:
+        logger.warning(f"Compression '{name}' is not available, using zlib instead.")
+        return zlib_compressor, readable
+    return by_name[name], readable
@@ -4,10 +4,12 @@ from jose import JWTError
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
+from app.core.config import settings
 from app.crud import user_crud
 from app.db.session import get_session
 from app.models.user_model import User
 from app.schemas.token_schema import TokenData
+from app.services import user_cache
 
 # This URL must match the path to your login endpoint exactly
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
@@ -18,7 +20,8 @@ async def get_current_user(
 ) -> User:
     """
     Dependency to get the current user from a JWT token.
-    This is the only dependency needed for now.
+    The user is looked up by the id in `sub` and cached briefly, so most
+    requests never touch the database here.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,8 +36,26 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = await user_crud.get_user_by_email(email=token_data.sub, db=db)
+    if (user := await user_cache.get_user(token_data.sub)) is not None:
+        return user
+
+    if token_data.sub.isdigit():
+        user = await user_crud.get_user_by_id(user_id=int(token_data.sub), db=db)
+    else:
+        # Tokens issued before the user id moved into `sub` carry the email.
+        user = await user_crud.get_user_by_email(email=token_data.sub, db=db)
     if user is None:
         raise credentials_exception
 
+    await user_cache.set_user(token_data.sub, user)
     return user
+
+
+async def get_stats_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Dependency for operational endpoints: only accounts in STATS_ADMIN_EMAILS pass."""
+    if current_user.email not in settings.STATS_ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to read service stats",
+        )
+    return current_user
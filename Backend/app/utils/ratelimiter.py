@@ -1,33 +1,154 @@
 import asyncio
-from datetime import datetime, timedelta
+import logging
+import time
 
+from redis.asyncio import Redis
 
-class RateLimiter:
-    def __init__(self, max_requests=3, time_window=1):
-        self.max_requests = max_requests
-        self.time_window = time_window
-        self.requests = []
+logger = logging.getLogger("default")
 
-    async def acquire(self):
-        now = datetime.now()
-        # Remove requests older than time_window
-        self.requests = [
-            req_time
-            for req_time in self.requests
-            if now - req_time < timedelta(seconds=self.time_window)
-        ]
+# Takes one token from every bucket, or none if any bucket is empty.
+# KEYS: one hash per bucket. ARGV: capacity and refill rate (tokens per ms)
+# for each bucket, in the same order. Returns 0 on success, otherwise the
+# number of milliseconds to wait before trying again. The clock comes from
+# Redis so every worker agrees on it.
+_TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tokens = {}
+local wait = 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local available = tonumber(state[1]) or capacity
+    local last = tonumber(state[2]) or now
+    available = math.min(capacity, available + math.max(0, now - last) * rate)
+    if available < 1 then
+        wait = math.max(wait, math.ceil((1 - available) / rate))
+    end
+    tokens[i] = available
+end
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    if wait == 0 then
+        tokens[i] = tokens[i] - 1
+    end
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i]), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate) + 1000)
+end
+return wait
+"""
 
-        if len(self.requests) >= self.max_requests:
-            sleep_time = self.time_window - (now - self.requests[0]).total_seconds()
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
 
-        self.requests.append(now)
+class _LocalBucket:
+    """In-process token bucket used when Redis cannot be reached."""
 
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period  # tokens per second
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
 
-# Create a global rate limiter
-rate_limiter = RateLimiter(max_requests=3, time_window=1)
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
 
+    def wait_time(self) -> float:
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
 
-async def _make_request(endpoint: str, params: dict = None):
-    await rate_limiter.acquire()  # Add this line
+
+class TokenBucketLimiter:
+    """
+    A token-bucket rate limiter shared by every worker through Redis.
+
+    `limits` is a list of (requests, period in seconds) pairs, e.g.
+    [(3, 1), (60, 60)] for "3 per second and 60 per minute"; a call must get
+    a token from every bucket. If Redis is unavailable the limiter degrades
+    to per-process buckets with the same limits, and only tries Redis again
+    after `redis_retry_seconds`, so calls do not each wait on a Redis timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limits: list[tuple[int, float]],
+        redis: Redis,
+        redis_retry_seconds: float = 5.0,
+    ):
+        self.name = name
+        self.limits = limits
+        self._keys = [f"ratelimit:{name}:{requests}/{period}" for requests, period in limits]
+        self._args = []
+        for requests, period in limits:
+            self._args += [requests, requests / (period * 1000)]
+        self._script = redis.register_script(_TOKEN_BUCKET_SCRIPT)
+        self._local = [_LocalBucket(requests, period) for requests, period in limits]
+        self._local_lock = asyncio.Lock()
+        self._redis_retry_seconds = redis_retry_seconds
+        self._redis_retry_at = 0.0
+
+        self.acquired = 0
+        self.waited = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.fallbacks = 0
+
+    async def _acquire_distributed(self) -> None:
+        while (wait_ms := await self._script(keys=self._keys, args=self._args)) > 0:
+            await asyncio.sleep(wait_ms / 1000)
+
+    async def _acquire_local(self) -> None:
+        # The lock keeps waiters in FIFO order instead of racing for each token.
+        async with self._local_lock:
+            while True:
+                for bucket in self._local:
+                    bucket.refill()
+                wait = max(bucket.wait_time() for bucket in self._local)
+                if wait == 0:
+                    for bucket in self._local:
+                        bucket.tokens -= 1
+                    return
+                await asyncio.sleep(wait)
+
+    async def acquire(self) -> None:
+        """Waits until a request is allowed under every limit."""
+        started = time.monotonic()
+        if started < self._redis_retry_at:
+            self.fallbacks += 1
+            await self._acquire_local()
+        else:
+            try:
+                await self._acquire_distributed()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.fallbacks += 1
+                self._redis_retry_at = time.monotonic() + self._redis_retry_seconds
+                logger.warning(
+                    f"Rate limiter '{self.name}' falling back to local buckets for "
+                    f"{self._redis_retry_seconds:g}s: {e!r}"
+                )
+                await self._acquire_local()
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        if waited > 0.001:
+            self.waited += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def stats(self) -> dict:
+        return {
+            "limits": [f"{requests}/{period}s" for requests, period in self.limits],
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "avg_wait_seconds": (
+                round(self.total_wait_seconds / self.waited, 3) if self.waited else 0.0
+            ),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "fallbacks": self.fallbacks,
+            "using_local_buckets": time.monotonic() < self._redis_retry_at,
+        }
@@ -0,0 +1,26 @@
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form for matching user-typed text: Unicode NFKC (so full-width
+    and other compatibility characters fold to their plain forms), case
+    folded, with runs of whitespace collapsed to a single space.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def normalize_query(text: str) -> str:
+    """
+    normalize_text with punctuation treated as whitespace, so "one-piece",
+    "One Piece!" and "one  piece" are the same search.
+    """
+    text = "".join(
+        " " if unicodedata.category(char).startswith("P") else char
+        for char in unicodedata.normalize("NFKC", text)
+    )
+    return normalize_text(text)
@@ -1,28 +1,80 @@
+import argparse
 import asyncio
-from redis import asyncio as aioredis
-from app.core.config import settings
+import sys
 
-async def clear_redis_cache():
+from app.db.redis_conn import redis_bytes_client, redis_client
+from app.services import cache, manga_service
+
+
+async def clear_cache(families: list[str], mal_ids: list[int], dry_run: bool):
     """
-    Connects to Redis using the URL from your .env file
-    and deletes all keys.
+    Invalidates whole cache families by bumping their generation, and single
+    titles by deleting their details key plus every cached list tagged with
+    them. Nothing else in Redis is touched.
     """
-    print("--- Connecting to Redis... ---")
+    prefix = "[dry run] " if dry_run else ""
     try:
-        # Create a client and connect
-        redis = aioredis.from_url(str(settings.REDIS_URL))
-
-        # Run the FLUSHALL command
-        await redis.flushall()
-        
-        print("✅ Cache cleared successfully!")
+        generations = await cache.get_generations()
+        for family in families:
+            if dry_run:
+                current = generations[family]
+                print(f"{prefix}Would move {family} from generation {current} to {current + 1}")
+            else:
+                generation = await cache.invalidate_family(family)
+                print(f"✅ Invalidated {family}, now at generation {generation}")
 
-        # Close the connection
-        await redis.close()
-        print("--- Connection closed. ---")
+        for mal_id in mal_ids:
+            if dry_run:
+                key = manga_service.manga_details_cache_target(mal_id).key
+                cached = await cache.peek(key) is not None
+                print(f"{prefix}Would drop {key} ({'cached' if cached else 'not cached'})")
+                for list_key in await cache.get_tagged_keys(mal_id):
+                    print(f"{prefix}Would drop list {list_key}")
+            else:
+                existed, lists = await manga_service.invalidate_manga_details(mal_id)
+                print(
+                    f"✅ Invalidated manga {mal_id}{'' if existed else ' (was not cached)'}"
+                    f" and {lists} cached list(s) containing it"
+                )
 
     except Exception as e:
         print(f"❌ An error occurred: {e}")
+        sys.exit(1)
+    finally:
+        await redis_bytes_client.aclose()
+        await redis_client.aclose()
+
 
 if __name__ == "__main__":
-    asyncio.run(clear_redis_cache())
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Invalidate cached Jikan data without flushing Redis."
+    )
+    parser.add_argument(
+        "--family",
+        action="append",
+        default=[],
+        choices=sorted(cache.POLICIES),
+        help="Invalidate every key of this family (repeatable).",
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="Invalidate every cache family."
+    )
+    parser.add_argument(
+        "--mal-id",
+        action="append",
+        type=int,
+        default=[],
+        help=(
+            "Invalidate one title's details and every cached list containing it, "
+            "and mark its mirror row stale (repeatable)."
+        ),
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Show what would be invalidated."
+    )
+    args = parser.parse_args()
+
+    families = sorted(cache.POLICIES) if args.all else list(dict.fromkeys(args.family))
+    if not families and not args.mal_id:
+        parser.error("nothing to invalidate: pass --family, --all or --mal-id")
+    asyncio.run(clear_cache(families, args.mal_id, args.dry_run))
@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.redis_conn import redis_client as redis
+from app.services import jikan_client, manga_service
+
+# Where the next page to sync is stored, so an interrupted run can resume.
+CURSOR_KEY = "catalogue_sync:cursor"
+
+
+async def sync_catalogue(restart: bool, max_pages: int | None, stale_after_hours: float):
+    """
+    Pages through Jikan's manga listing and upserts every title into the
+    local metadata mirror, one batch of pages per transaction.
+    Only records older than `stale_after_hours` are rewritten.
+    """
+    if restart:
+        await redis.delete(CURSOR_KEY)
+    page = int(await redis.hget(CURSOR_KEY, "next_page") or 1)
+    stale_before = datetime.now(timezone.utc) - timedelta(hours=stale_after_hours)
+    last_page = page + max_pages if max_pages else None
+    total_written = 0
+
+    print(f"--- Syncing catalogue from page {page}... ---")
+    try:
+        while last_page is None or page < last_page:
+            pages = settings.CATALOGUE_SYNC_PAGES_PER_BATCH
+            if last_page is not None:
+                pages = min(pages, last_page - page)
+
+            page, has_more, written = await manga_service.sync_catalogue_batch(
+                page, pages, stale_before=stale_before
+            )
+            total_written += written
+            if not has_more:
+                # Finished: the next run starts over and only refreshes stale records.
+                await redis.delete(CURSOR_KEY)
+                print(f"✅ Catalogue sync complete, {total_written} records written.")
+                return
+
+            await redis.hset(
+                CURSOR_KEY,
+                mapping={"next_page": page, "updated_at": datetime.now(timezone.utc).isoformat()},
+            )
+            print(f"  ...synced up to page {page - 1} ({total_written} records written)")
+
+        print(f"✅ Stopped after --max-pages, will resume from page {page}.")
+
+    except jikan_client.JikanError as e:
+        print(f"❌ Jikan failed, will resume from page {page}: {e}")
+        sys.exit(1)
+    finally:
+        await jikan_client.close_client()
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pre-warm the local manga catalogue from Jikan."
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore the saved cursor and start from page 1"
+    )
+    parser.add_argument("--max-pages", type=int, help="stop after this many pages")
+    parser.add_argument(
+        "--stale-after-hours",
+        type=float,
+        default=settings.CATALOGUE_MAX_AGE_SECONDS / 3600,
+        help="only rewrite records fetched longer ago than this (default: CATALOGUE_MAX_AGE_SECONDS)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(sync_catalogue(args.restart, args.max_pages, args.stale_after_hours))
@@ -0,0 +1,31 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from fixture_jikan import FixtureJikan
+
+# Scripts like sync_catalogue.py import `app` from the Backend directory.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings are read when `app` is first imported, so the fixture server has to
+# be running and configured before any test module imports it.
+jikan = FixtureJikan()
+jikan.start()
+os.environ["JIKAN_API_BASE_URL"] = jikan.base_url
+os.environ["JIKAN_RATE_PER_SECOND"] = "1000"
+os.environ["JIKAN_RATE_PER_MINUTE"] = "60000"
+os.environ["JIKAN_MAX_RETRIES"] = "0"
+os.environ["CATALOGUE_SYNC_PAGE_SIZE"] = "2"
+os.environ["CATALOGUE_SYNC_PAGES_PER_BATCH"] = "1"
+
+
+@pytest.fixture
+def fixture_jikan() -> FixtureJikan:
+    jikan.reset()
+    return jikan
+
+
+def pytest_unconfigure(config):
+    jikan.stop()
@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_title(mal_id: int, title: str) -> dict:
+    """A /manga listing item with the fields the app maps from Jikan."""
+    return {
+        "mal_id": mal_id,
+        "title": title,
+        "title_english": f"{title} (English)",
+        "status": "Publishing",
+        "images": {"jpg": {"image_url": f"https://cdn.example/{mal_id}.jpg"}},
+        "authors": [{"name": "Fixture, Author"}],
+        "published": {"from": "2001-04-01T00:00:00+00:00"},
+        "score": 8.5,
+        "genres": [{"name": "Action"}, {"name": "Adventure"}],
+        "synopsis": f"Synopsis of {title}.",
+    }
+
+
+class FixtureJikan:
+    """
+    A local stand-in for Jikan's paged /manga listing, served from memory.
+    Point JIKAN_API_BASE_URL at `base_url`. Pages in `fail_pages` answer 503,
+    and every page asked for is recorded in `requested_pages`.
+    """
+
+    def __init__(self):
+        self.titles: list[dict] = []
+        self.fail_pages: set[int] = set()
+        self.requested_pages: list[int] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v4"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self) -> None:
+        self.titles = []
+        self.fail_pages = set()
+        self.requested_pages = []
+
+    def page(self, page: int, limit: int) -> dict:
+        titles = sorted(self.titles, key=lambda title: title["mal_id"])
+        data = titles[(page - 1) * limit : page * limit]
+        last_page = max(1, -(-len(titles) // limit))
+        return {
+            "data": data,
+            "pagination": {
+                "current_page": page,
+                "last_visible_page": last_page,
+                "has_next_page": page < last_page,
+                "items": {"count": len(data), "total": len(titles), "per_page": limit},
+            },
+        }
+
+    def _make_handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.rstrip("/") != "/v4/manga":
+                    self._send(404, {"status": 404, "message": "Not found"})
+                    return
+                query = parse_qs(url.query)
+                page = int(query.get("page", ["1"])[0])
+                limit = int(query.get("limit", ["25"])[0])
+                fixture.requested_pages.append(page)
+                if page in fixture.fail_pages:
+                    self._send(503, {"status": 503, "message": "Service unavailable"})
+                    return
+                self._send(200, fixture.page(page, limit))
+
+            def _send(self, status: int, body: dict) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
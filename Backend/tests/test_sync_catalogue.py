@@ -0,0 +1,148 @@
+"""
+sync_catalogue.py end to end, against the fixture Jikan server.
+
+Needs the Postgres database (migrated) and Redis that DATABASE_URL and
+REDIS_URL point at; use disposable ones. Only mirror rows with mal_ids from
+FIRST_MAL_ID up and a test-only cursor key are touched.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("sqlmodel")
+pytest.importorskip("redis")
+
+from sqlalchemy import delete, select, update
+
+import sync_catalogue
+from app.db.redis_conn import redis_client
+from app.db.session import AsyncSessionLocal, engine
+from app.models.manga_model import MangaMetadata
+from fixture_jikan import make_title
+
+FIRST_MAL_ID = 990_000_001
+TITLE_COUNT = 5  # three pages of two
+MAL_IDS = list(range(FIRST_MAL_ID, FIRST_MAL_ID + TITLE_COUNT))
+CURSOR_KEY = "catalogue_sync:cursor:test"
+
+
+def _run(coroutine_function, *args):
+    """Runs a coroutine on a fresh event loop, then drops connections bound to that loop."""
+
+    async def _main():
+        try:
+            return await coroutine_function(*args)
+        finally:
+            await engine.dispose()
+            await redis_client.aclose()
+
+    return asyncio.run(_main())
+
+
+def _sync(restart: bool, stale_after_hours: float = 24):
+    _run(sync_catalogue.sync_catalogue, restart, None, stale_after_hours)
+
+
+def _titles(prefix: str) -> list[dict]:
+    return [make_title(mal_id, f"{prefix} {mal_id}") for mal_id in MAL_IDS]
+
+
+async def _mirror() -> dict[int, MangaMetadata]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(MangaMetadata).where(MangaMetadata.mal_id >= FIRST_MAL_ID)
+        )
+        return {row.mal_id: row for row in result.scalars().all()}
+
+
+async def _cursor() -> dict:
+    return await redis_client.hgetall(CURSOR_KEY)
+
+
+async def _age(mal_id: int, age: timedelta) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(MangaMetadata)
+            .where(MangaMetadata.mal_id == mal_id)
+            .values(fetched_at=datetime.now(timezone.utc) - age)
+        )
+        await db.commit()
+
+
+async def _clean() -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(MangaMetadata).where(MangaMetadata.mal_id >= FIRST_MAL_ID))
+        await db.commit()
+    await redis_client.delete(CURSOR_KEY)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def services():
+    async def _ping():
+        await redis_client.ping()
+        async with AsyncSessionLocal() as db:
+            await db.execute(select(MangaMetadata.mal_id).limit(1))
+
+    try:
+        _run(_ping)
+    except Exception as e:
+        pytest.skip(f"Postgres and Redis are not reachable: {e!r}")
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(sync_catalogue, "CURSOR_KEY", CURSOR_KEY)
+    _run(_clean)
+    yield
+    _run(_clean)
+
+
+def test_full_run_mirrors_every_page(fixture_jikan):
+    fixture_jikan.titles = _titles("First")
+
+    _sync(restart=True)
+
+    mirror = _run(_mirror)
+    assert sorted(mirror) == MAL_IDS
+    assert mirror[FIRST_MAL_ID].title == f"First {FIRST_MAL_ID}"
+    assert mirror[FIRST_MAL_ID].author == "Fixture, Author"
+    assert fixture_jikan.requested_pages == [1, 2, 3]
+    # A finished run clears its cursor, so the next one starts over.
+    assert _run(_cursor) == {}
+
+
+def test_interrupted_run_resumes_from_cursor(fixture_jikan):
+    fixture_jikan.titles = _titles("First")
+    fixture_jikan.fail_pages = {2}
+
+    with pytest.raises(SystemExit):
+        _sync(restart=True)
+
+    assert _run(_cursor)["next_page"] == "2"
+    assert sorted(_run(_mirror)) == MAL_IDS[:2]
+
+    fixture_jikan.fail_pages.clear()
+    fixture_jikan.requested_pages.clear()
+    _sync(restart=False)
+
+    assert fixture_jikan.requested_pages == [2, 3]
+    assert sorted(_run(_mirror)) == MAL_IDS
+    assert _run(_cursor) == {}
+
+
+def test_second_run_only_rewrites_stale_rows(fixture_jikan):
+    fixture_jikan.titles = _titles("First")
+    _sync(restart=True)
+    stale_id = MAL_IDS[1]
+    _run(_age, stale_id, timedelta(hours=48))
+
+    fixture_jikan.titles = _titles("Second")
+    _sync(restart=False, stale_after_hours=24)
+
+    mirror = _run(_mirror)
+    assert mirror[stale_id].title == f"Second {stale_id}"
+    assert mirror[stale_id].fetched_at > datetime.now(timezone.utc) - timedelta(hours=1)
+    for mal_id in MAL_IDS:
+        if mal_id != stale_id:
+            assert mirror[mal_id].title == f"First {mal_id}"